@@ -1,4 +1,5 @@
 import threading
+import time
 import yaml
 from ping_addresses import MultiPingChecker, RobotConfig
 from ping_gui import PingerGUI
@@ -7,8 +8,7 @@ class MultiPingCheckerGUI(MultiPingChecker):
     def __init__(self, dict_of_addresses=None, config_path='config.yaml'):
         # If no addresses provided, load from config
         if dict_of_addresses is None:
-            config = RobotConfig.load_config(config_path)
-            dict_of_addresses = RobotConfig.get_robot_addresses(config)
+            dict_of_addresses = RobotConfig.get_robot_addresses_cached(config_path)
             # Add VPN and RM if not in config
             if "VPN" not in dict_of_addresses:
                 dict_of_addresses["VPN"] = "192.168.1.1"
@@ -19,13 +19,15 @@ class MultiPingCheckerGUI(MultiPingChecker):
         self.ping_gui = PingerGUI(dict_of_addresses, "Flexa Pinger GUI beta")
 
     def updatePingerTimerThread(self):
-        if (self.ping_gui.continue_gui):
+        ## Single persistent loop instead of re-spawning a threading.Timer
+        ## per tick; reschedules in place by sleeping on the stop event
+        while self.ping_gui.continue_gui and self.running:
             self.updatePingerStatus()
-            self.ping_gui.update_ping_status(self.dict_of_ping_status, self.dict_of_robot_status, self.dict_of_cleaning_device_status)
-            self.ping_status_thread = threading.Timer(self.update_interval, self.updatePingerTimerThread)
-            self.ping_status_thread.start()
-        else:
-            self.stopAll()
+            ## Hand the state to the GUI thread via its queue instead of
+            ## mutating GUI dicts from this thread
+            self.ping_gui.submit_update(self.dict_of_ping_status, self.dict_of_robot_status, self.dict_of_cleaning_device_status)
+            time.sleep(self.update_interval)
+        self.stopAll()
 
     def startAll(self, blocking=False):
         self.startPing()
@@ -2,11 +2,23 @@
 import rospy
 import os
 from os.path import join, dirname
+import re
+import selectors
 import subprocess
 import logging
 import time
 import json
 
+# Prefer the orjson C serializer for the debug motor-data dumps
+try:
+    import orjson
+
+    def _json_dumps(obj):
+        return orjson.dumps(obj).decode()
+except ImportError:
+    def _json_dumps(obj):
+        return json.dumps(obj)
+
 # Configure logging with more details
 logging.basicConfig(
     level=logging.DEBUG,  # Change to DEBUG for more verbose logging
@@ -37,7 +49,30 @@ ROS_MASTER_PASSWD = os.environ.get("ROS_MASTER_PASSWD")
 if not ROS_MASTER_PASSWD:
     logger.warning("ROS_MASTER_PASSWD environment variable not set, SSH connections may fail")
 
+# Message type for the direct TCPROS subscription; only available when the
+# robot workspace is sourced, so fall back to the SSH path without it
+try:
+    from flexa_motor_controller.msg import MotorAggregateInfo
+except ImportError:
+    MotorAggregateInfo = None
+    logger.warning("flexa_motor_controller msgs not available, motor data will be read over SSH")
+
+# Pre-compiled parser for `rostopic echo` output: one scan finds the motor
+# blocks, a second pulls the key/value fields inside each block. Patterns are
+# bytes so the SSH output is parsed without a decode pass; the wire format is
+# already lowercase, so no normalization is needed either.
+_MOTOR_RE = re.compile(rb'^(motor\d+)\s*:\s*$((?:\n[ \t]+\w+\s*:[^\n]*)+)', re.MULTILINE)
+_FIELD_RE = re.compile(rb'(\w+)\s*:\s*([-+0-9.eE]+)')
+
+
 class MotorController:
+    ## rospy.init_node is process-global; guard so only the first controller
+    ## registers with the master and later instances just reuse the node.
+    ## _node_master records which master that was, because the direct
+    ## subscription below is only valid against that one master
+    _node_initialized = False
+    _node_master = None
+
     def __init__(self, ssh_host: str="192.168.1.100", ssh_user: str=None, ssh_passwd:str=None, rate: int=120):
         """
         Initialize a motor controller for a specific robot.
@@ -57,19 +92,137 @@ class MotorController:
         self.connection_timeout = 15
         self.cmd_timeout = 20
         self.topic_verified = False
+
+        # SSH command templates, built once instead of per call. Using argv
+        # lists with shell=False also skips the /bin/sh fork per invocation.
+        # ControlMaster/ControlPersist multiplex the connection so the
+        # TCP+SSH handshake is paid once per ControlPersist window
+        ssh_base_argv = [
+            "sshpass", "-p", str(self.ssh_passwd), "ssh",
+            "-o", f"ConnectTimeout={self.connection_timeout}",
+            "-o", "StrictHostKeyChecking=no",
+            "-o", "ControlMaster=auto",
+            "-o", f"ControlPath=/tmp/ssh-motor-{ssh_host}",
+            "-o", "ControlPersist=600",
+        ]
+        ssh_target = f"{self.ssh_user}@{self.ssh_host}"
+        remote_env = ("source /opt/ros/noetic/setup.bash && "
+                      "source ~/catkin_ws/devel/setup.bash && ")
+        self._verify_argv = ssh_base_argv + [
+            ssh_target,
+            remote_env + "rostopic list | grep flexa_motor_controller",
+        ]
+        self._list_topics_argv = ssh_base_argv + [
+            "-o", "BatchMode=no",
+            ssh_target,
+            remote_env + "rostopic list",
+        ]
+        self._read_argv = ssh_base_argv + [
+            "-o", "ServerAliveInterval=5",
+            "-o", "ServerAliveCountMax=3",
+            "-o", "BatchMode=no",
+            "-o", "LogLevel=ERROR",
+            ssh_target,
+            remote_env + "rostopic echo -n 1 /flexa_motor_controller/motor_agg_info",
+        ]
         
         logger.info(f"Initializing MotorController for {ssh_host}")
 
         
-        os.environ["ROS_MASTER_URI"] = self.ROS_MASTER_URI
         try:
-            rospy.init_node(f'motor_data_reader_{ssh_host.replace(".", "_")}', anonymous=True)
+            if not MotorController._node_initialized:
+                # Set the master URI once, before the single init_node call;
+                # rospy caches it at init time so per-instance mutation after
+                # this point would be racy anyway
+                os.environ["ROS_MASTER_URI"] = self.ROS_MASTER_URI
+                rospy.init_node('motor_data_reader', anonymous=True)
+                MotorController._node_initialized = True
+                MotorController._node_master = self.ROS_MASTER_URI
+                logger.info(f"Initialized ROS node (master {self.ROS_MASTER_URI})")
             self.rate = rospy.Rate(rate)
-            logger.info(f"Initialized ROS node for {ssh_host}")
         except Exception as e:
             logger.error(f"Failed to initialize ROS node for {ssh_host}: {e}")
             self.rate = None
 
+        # Latest message from the direct subscription and when it arrived
+        self._latest_msg = None
+        self._latest_msg_time = 0.0
+        self._msg_max_age = 5.0
+        self._subscriber = None
+        if (MotorAggregateInfo is not None and self.rate is not None
+                and MotorController._node_master == self.ROS_MASTER_URI):
+            # The process-wide node talks to exactly one master, so only
+            # the controller for that robot may take the direct
+            # subscription; every other robot's topic lives on a different
+            # master and must keep using the SSH fallback
+            try:
+                # Subscribe over TCPROS and cache the latest message so
+                # read_motor_data is a field copy instead of an SSH round-trip
+                self._subscriber = rospy.Subscriber(
+                    '/flexa_motor_controller/motor_agg_info', MotorAggregateInfo,
+                    self._on_motor_msg, queue_size=1, tcp_nodelay=True, buff_size=2**16)
+                logger.info(f"Subscribed to motor topic on {ssh_host}")
+            except Exception as e:
+                logger.error(f"Failed to subscribe to motor topic on {ssh_host}: {e}")
+
+    def _on_motor_msg(self, msg):
+        """Cache the latest motor message from the direct subscription"""
+        self._latest_msg = msg
+        self._latest_msg_time = time.time()
+
+    def _motor_data_from_msg(self, msg) -> dict:
+        """Copy fields out of a MotorAggregateInfo message into the dict format"""
+        data = {}
+        for motor_name in ('motor1', 'motor2'):
+            motor = getattr(msg, motor_name)
+            data[motor_name] = {
+                "pos_rad": motor.pos_rad,
+                "pos_offset": motor.pos_offset,
+                "vel_rpm": motor.vel_rpm,
+                "vel_rad": motor.vel_rad,
+                "current": motor.current,
+            }
+        return data
+
+    def _run_with_deadline(self, argv, timeout):
+        """Run a command, draining stdout/stderr from one select loop.
+
+        communicate(timeout=...) burns a helper thread per stream with its
+        own polling granularity; this reads both pipes off a single
+        selector against one monotonic deadline and kills the process if
+        the deadline passes.
+
+        Returns:
+            (process, stdout_bytes, stderr_bytes)
+        """
+        process = subprocess.Popen(argv, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        deadline = time.monotonic() + timeout
+        chunks = {process.stdout: [], process.stderr: []}
+        sel = selectors.DefaultSelector()
+        sel.register(process.stdout, selectors.EVENT_READ)
+        sel.register(process.stderr, selectors.EVENT_READ)
+        try:
+            while sel.get_map():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    process.kill()
+                    raise subprocess.TimeoutExpired(argv, timeout)
+                for key, _ in sel.select(remaining):
+                    data = key.fileobj.read1(65536)
+                    if data:
+                        chunks[key.fileobj].append(data)
+                    else:
+                        sel.unregister(key.fileobj)
+        finally:
+            sel.close()
+
+        try:
+            process.wait(timeout=max(deadline - time.monotonic(), 0.1))
+        except subprocess.TimeoutExpired:
+            process.kill()
+            raise
+        return process, b''.join(chunks[process.stdout]), b''.join(chunks[process.stderr])
+
     def verify_motor_topic(self) -> bool:
         """
         Verify if the motor topic exists on the robot
@@ -82,18 +235,7 @@ class MotorController:
             
         try:
             # Check if the topic exists
-            cmd = (
-                f"sshpass -p '{self.ssh_passwd}' ssh "
-                f"-o ConnectTimeout={self.connection_timeout} "
-                f"-o StrictHostKeyChecking=no "
-                f"{self.ssh_user}@{self.ssh_host} "
-                f"'source /opt/ros/noetic/setup.bash && "
-                f"source ~/catkin_ws/devel/setup.bash && "
-                f"rostopic list | grep flexa_motor_controller'"
-            )
-            
-            process = subprocess.Popen(cmd, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            output, error = process.communicate(timeout=10)
+            process, output, error = self._run_with_deadline(self._verify_argv, 10)
             
             if output:
                 logger.info(f"Verified motor topic on {self.ssh_host}: {output.decode().strip()}")
@@ -112,20 +254,7 @@ class MotorController:
     def list_available_topics(self):
         """List all available topics on the robot for diagnosis"""
         try:
-            cmd = (
-                f"sshpass -p '{self.ssh_passwd}' ssh "
-                f"-o ConnectTimeout={self.connection_timeout} "
-                f"-o StrictHostKeyChecking=no "
-                f"-o BatchMode=no "
-                f"{self.ssh_user}@{self.ssh_host} "
-                f"'source /opt/ros/noetic/setup.bash && "
-                f"source ~/catkin_ws/devel/setup.bash && "
-                f"rostopic list'"
-            )
-
-            
-            process = subprocess.Popen(cmd, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            output, error = process.communicate(timeout=10)
+            process, output, error = self._run_with_deadline(self._list_topics_argv, 10)
             
             if output:
                 topics = output.decode().strip().split("\n")
@@ -143,42 +272,31 @@ class MotorController:
         """
         Read motor data and parse it into a dictionary with error handling and validation.
         """
-        print("? DEBUG: read_motor_data called for " + self.ssh_host)
+        logger.debug("read_motor_data called for %s", self.ssh_host)
+
+        # Fast path: use the cached message from the direct subscription when
+        # it is fresh; SSH below is only the fallback
+        if self._latest_msg is not None and (time.time() - self._latest_msg_time) < self._msg_max_age:
+            motor_data = self._motor_data_from_msg(self._latest_msg)
+            self._log_motor_data(motor_data)
+            self.connection_attempts = 0
+            return motor_data
 
-        print(f"{self.ssh_user}@{self.ssh_host} w/ {self.ssh_passwd}")
-        
         # Don't keep trying if we've exceeded max attempts
         if self.connection_attempts >= self.max_connection_attempts:
-            print("? DEBUG: Max connection attempts reached, skipping")
+            logger.debug("Max connection attempts reached for %s, skipping", self.ssh_host)
             self.connection_attempts = 0
             return None
             
         try:
-            # Enhanced SSH command with longer timeouts and retries
-            print("? DEBUG: Preparing to execute SSH command")
-            cmd = (
-                f"sshpass -p '{self.ssh_passwd}' ssh "
-                f"-o ConnectTimeout={self.connection_timeout} "
-                f"-o StrictHostKeyChecking=no "
-                f"-o ServerAliveInterval=5 "
-                f"-o ServerAliveCountMax=3 "
-                f"-o BatchMode=no "
-                f"-o LogLevel=ERROR "
-                f"{self.ssh_user}@{self.ssh_host} "
-                f"'source /opt/ros/noetic/setup.bash && "
-                f"source ~/catkin_ws/devel/setup.bash && "
-                f"rostopic echo -n 1 /flexa_motor_controller/motor_agg_info'"
-            )
+            logger.debug("Executing SSH command for %s", self.ssh_host)
+            process, output, error = self._run_with_deadline(self._read_argv, self.cmd_timeout)
             
-            print("? DEBUG: Executing SSH command for " + self.ssh_host)
-            process = subprocess.Popen(cmd, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            output, error = process.communicate(timeout=self.cmd_timeout)
-            
-            print("? DEBUG: SSH command completed with return code " + str(process.returncode))
+            logger.debug("SSH command completed with return code %s", process.returncode)
             
             if error:
                 error_text = error.decode()
-                print(f"? DEBUG: SSH error: {error_text[:100]}")
+                logger.debug("SSH error: %s", error_text[:100])
                 if "Connection refused" in error_text or "Connection timed out" in error_text:
                     self.connection_attempts += 1
                     logger.error(f"Connection error ({self.connection_attempts}/{self.max_connection_attempts}) for {self.ssh_host}: {error_text}")
@@ -191,16 +309,11 @@ class MotorController:
                 logger.error(f"No data received from motors on {self.ssh_host} (attempt {self.connection_attempts}/{self.max_connection_attempts})")
                 return None
                 
-            # Parse the output
-            output_str = output.decode()
-            logger.debug(f"Raw output from {self.ssh_host}: {output_str[:100]}")
+            # Parse the raw bytes directly, no decode pass needed
+            logger.debug("Raw output from %s: %s", self.ssh_host, output[:100])
 
             # Parse the real data first
-            motor_data = self._parse_motor_data(output_str)
-
-            # For debugging only - parse test data to check parser works, but don't use the result
-            test_data = self._parse_motor_data("motor1: \n  pos_rad: 96853.57659399601\n  pos_offset: -0.0007363080000000001\n  vel_rpm: 0.0\n  vel_rad: 0.0\n  current: 0.338\nmotor2: \n  pos_rad: 97109.83687382701\n  pos_offset: -0.0007976670000000001\n  vel_rpm: -0.20000053920000002\n  vel_rad: -0.020944\n  current: 0.605")
-            print(f"? DEBUG: Test parsing works: {test_data is not None and len(test_data) > 0}")
+            motor_data = self._parse_motor_data(output)
 
             # Log the real data results
             if motor_data:
@@ -224,71 +337,36 @@ class MotorController:
         
         
     
-    def _parse_motor_data(self, output_str) -> dict:
-        """Internal method to parse motor data output with fixed robust parsing"""
-        print("\n\n??? MOTOR DEBUG ???")
-        print("? DEBUG: Starting motor parsing for " + self.ssh_host)
+    def _parse_motor_data(self, output) -> dict:
+        """Internal method to parse raw motor data bytes with a single regex scan"""
         try:
             # Expected fields and motors
-            EXPECTED_FIELDS = {'pos_rad', 'pos_offset', 'vel_rpm', 'vel_rad', 'current'}
-            EXPECTED_MOTORS = {'motor1', 'motor2'}
-                
-            # Parse the output into a dictionary
+            EXPECTED_FIELDS = {b'pos_rad', b'pos_offset', b'vel_rpm', b'vel_rad', b'current'}
+
+            if isinstance(output, str):
+                output = output.encode()
+
+            # One pass over the whole output instead of per-line Python work
             motor_data = {}
-            current_motor = None
-            
-            # First, try to parse line by line
-            for line in output_str.split('\n'):
-                line = line.strip()
-                if not line or line.startswith('[INFO]'):
-                    continue
-                    
-                # Handle motor header lines (with or without colon)
-                if line.lower().startswith('motor'):
-                    # Extract motor name
-                    if ':' in line:
-                        current_motor = line.split(':')[0].strip().lower()
-                    else:
-                        current_motor = line.strip().lower()
-                    
-                    print(f"? DEBUG: Found motor header: '{current_motor}'")
-                    
-                    if current_motor not in EXPECTED_MOTORS:
-                        print(f"? DEBUG: Unexpected motor identifier: {current_motor}")
-                    
-                    motor_data[current_motor] = {}
-                    
-                # Handle data lines that have a colon
-                elif current_motor and ':' in line:
+            for motor_match in _MOTOR_RE.finditer(output):
+                current_motor = motor_match.group(1).decode()
+                fields = {}
+                for key, value_str in _FIELD_RE.findall(motor_match.group(2)):
+                    if key not in EXPECTED_FIELDS:
+                        continue
                     try:
-                        key, value = line.split(':', 1)  # Split on first colon only
-                        key = key.strip().lower()
-                        
-                        if key not in EXPECTED_FIELDS:
-                            print(f"? DEBUG: Unexpected field {key} for {current_motor}")
-                            continue
-                            
-                        try:
-                            value_str = value.strip()
-                            value = float(value_str)
-                            motor_data[current_motor][key] = value
-                            print(f"? DEBUG: {current_motor}.{key} = {value}")
-                        except ValueError:
-                            print(f"? DEBUG: Failed to convert value to float: '{value_str}' for {key}")
-                            motor_data[current_motor][key] = 0.0  # Default value on error
-                            
+                        fields[key.decode()] = float(value_str)
                     except ValueError:
-                        print(f"? DEBUG: Malformed line: '{line}'")
-                        continue
-            
-            print("? DEBUG: PARSING RESULT:")
-            print(f"? motor1: {motor_data.get('motor1', {})}")
-            print(f"? motor2: {motor_data.get('motor2', {})}")
-            print("??? END MOTOR DEBUG ???\n")
+                        fields[key.decode()] = 0.0  # Default value on error
+                motor_data[current_motor] = fields
+
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Parsed motor1: %s motor2: %s",
+                             motor_data.get('motor1', {}), motor_data.get('motor2', {}))
             return motor_data
-            
+
         except Exception as e:
-            print(f"? ERROR in parsing: {str(e)}")
+            logger.error(f"Error parsing motor data: {e}")
             return {"motor1": {}, "motor2": {}}
     
     def _log_motor_data(self, motor_data: dict):
@@ -311,12 +389,14 @@ class MotorController:
             else:
                 logger.warning(f"Robot {self.ssh_host} returned ALL ZEROS for motor values")
                 
-            # For debugging, show a compact representation of the data
-            compact_data = {
-                'motor1': {k: f"{v:.2f}" for k, v in motor1_values.items()},
-                'motor2': {k: f"{v:.2f}" for k, v in motor2_values.items()}
-            }
-            logger.debug(f"Motor data summary: {json.dumps(compact_data)}")
+            # For debugging, show a compact representation of the data; skip
+            # building it entirely unless debug logging is on
+            if logger.isEnabledFor(logging.DEBUG):
+                compact_data = {
+                    'motor1': {k: f"{v:.2f}" for k, v in motor1_values.items()},
+                    'motor2': {k: f"{v:.2f}" for k, v in motor2_values.items()}
+                }
+                logger.debug(f"Motor data summary: {_json_dumps(compact_data)}")
             
         except Exception as e:
             logger.error(f"Error logging motor data: {e}")
@@ -1,13 +1,126 @@
+import copy
 import datetime
+import mmap
+import os
+import time
 import threading
 import subprocess
 import yaml
 import json
+from collections import OrderedDict
 from rmHelper import RmHelper
 from motorReader import MotorController
 
 CONFIGPATH = "config.yaml"
 
+## Prefer the libyaml C loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+## Module-level YAML cache so N pingers don't re-parse the same file at startup.
+## Keyed by path, stores (mtime, size, parsed dict); bounded LRU.
+_YAML_CACHE = OrderedDict()
+_YAML_CACHE_MAX_ENTRIES = 100
+
+
+## Shared helpers: one RmHelper for all pingers and one MotorController per
+## host, instead of a fresh pair for every PeriodicAddressPinger
+_RM_HELPER = None
+_MOTOR_CTRL_CACHE = {}
+
+
+def _shared_rm_helper():
+    global _RM_HELPER
+    if _RM_HELPER is None:
+        _RM_HELPER = RmHelper()
+    return _RM_HELPER
+
+
+def _shared_motor_controller(address):
+    if address not in _MOTOR_CTRL_CACHE:
+        _MOTOR_CTRL_CACHE[address] = MotorController(ssh_host=address)
+    return _MOTOR_CTRL_CACHE[address]
+
+
+## TTL cache for RmHelper status lookups: robot assignments rarely change
+## within a few seconds, so a 1 s ping tick doesn't need a fresh API
+## round-trip every time
+_STATUS_CACHE_TTL = 10
+_status_cache = {}
+
+
+def _cached_status(kind, robot_name, fetch):
+    """Return a cached status value, refreshing it after the TTL expires."""
+    now = time.time()
+    hit = _status_cache.get((kind, robot_name))
+    if hit is not None and (now - hit[0]) < _STATUS_CACHE_TTL:
+        return hit[1]
+    value = fetch(robot_name)
+    _status_cache[(kind, robot_name)] = (now, value)
+    return value
+
+
+def _parse_config(config_path):
+    """Parse the config, preferring the pre-parsed JSON sidecar when fresh.
+
+    After each successful YAML parse a `<config>.json` sidecar is written
+    (atomically, via os.replace) so later startups pay a JSON decode
+    instead of a YAML parse. The sidecar is only trusted while its mtime
+    is at least as new as the YAML file.
+    """
+    sidecar = config_path + '.json'
+    try:
+        if os.stat(sidecar).st_mtime >= os.stat(config_path).st_mtime:
+            with open(sidecar) as f:
+                return json.load(f)
+    except (OSError, ValueError):
+        ## Missing or corrupt sidecar, fall back to the YAML parse
+        pass
+
+    ## Parse straight from the page cache via mmap instead of reading the
+    ## file into a Python string first; the context managers also guarantee
+    ## the fd is released if parsing blows up
+    with open(config_path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            data = yaml.load(buf, Loader=_YamlLoader)
+
+    try:
+        tmp = sidecar + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp, sidecar)
+    except (OSError, TypeError):
+        ## Sidecar is just an accelerator; never fail the load over it
+        pass
+
+    return data
+
+
+def load_yaml_cached(config_path=CONFIGPATH):
+    """Load and parse a YAML config, reusing the parse if the file is unchanged.
+
+    Returns a deep copy so callers can mutate their view without
+    poisoning the cache.
+    """
+    stat = os.stat(config_path)
+    key = config_path
+    cached = _YAML_CACHE.get(key)
+    if cached is not None and cached[0] == stat.st_mtime and cached[1] == stat.st_size:
+        ## Cache hit, refresh LRU position
+        _YAML_CACHE.move_to_end(key)
+        return copy.deepcopy(cached[2])
+
+    data = _parse_config(config_path)
+
+    _YAML_CACHE[key] = (stat.st_mtime, stat.st_size, data)
+    _YAML_CACHE.move_to_end(key)
+    while len(_YAML_CACHE) > _YAML_CACHE_MAX_ENTRIES:
+        _YAML_CACHE.popitem(last=False)
+
+    return copy.deepcopy(data)
+
 class PeriodicAddressPinger():
     def __init__(self, address_to_ping, ping_interval_in_seconds = 1):
         self.address_to_ping = address_to_ping
@@ -16,25 +129,24 @@ class PeriodicAddressPinger():
         self.continue_pinging = True
         self.subprocess_p = None
         self.ping_timer_thread = None
+        self._stop_event = threading.Event()
         self.robots = self._loadYaml()
         self.robot_status = {}
         self.cleaning_device_status = {}
         self.motor_data = {}
-        self.motor_controller = MotorController()
+        self.motor_controller = _shared_motor_controller(address_to_ping)
 
-        ## Make an instance of Rm helper
-        self.assistant = RmHelper()
+        ## All pingers share one Rm helper
+        self.assistant = _shared_rm_helper()
 
     def _loadYaml(self):
-        data = open(CONFIGPATH)
-        robots = yaml.safe_load(data)
-        data.close()
-        return robots["flexa"]
-       
+        robots = load_yaml_cached(CONFIGPATH)["flexa"]
+        ## Reverse lookup built once so _getRobotName is O(1) per ping
+        self._ip_to_name = {v["ip"]: v["name"] for v in robots.values()}
+        return robots
+
     def _getRobotName(self):
-        for k in self.robots:
-            if self.robots[k]["ip"] == self.address_to_ping:
-                return self.robots[k]['name']
+        return self._ip_to_name.get(self.address_to_ping)
 
  
     def pingAnAddress(self):
@@ -43,28 +155,33 @@ class PeriodicAddressPinger():
         self.subprocess_p = subprocess.Popen(["ping","-c", "1", "-W", "5", self.address_to_ping], stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
         res = self.subprocess_p.wait() # or .poll() after .wait()
         self.is_address_reachable = not res
-        self.robot_status = self.assistant.robotStatus(self._getRobotName())
-        self.cleaning_device_status = self.assistant.brushStatus(self._getRobotName())
+        robot_name = self._getRobotName()
+        self.robot_status = _cached_status("robot", robot_name, self.assistant.robotStatus)
+        self.cleaning_device_status = _cached_status("brush", robot_name, self.assistant.brushStatus)
+        ## Commit any 502 entries recorded during this pass; a no-op when
+        ## the logs are clean, so the common case pays one flag check
+        self.assistant.flushLogs()
         # print("[{}] {}: {}".format(time.ctime(), self.address_to_ping, self.is_address_reachable))
 
     def pingTimerThread(self):
-        self.pingAnAddress()
-        if (self.continue_pinging):
-            self.ping_timer_thread = threading.Timer(self.ping_interval_in_seconds, self.pingTimerThread)
-            self.ping_timer_thread.start()
+        ## Single persistent loop instead of spawning a new threading.Timer
+        ## per tick; Event.wait doubles as the interval sleep and lets
+        ## stopPing wake us immediately
+        while self.continue_pinging and not self._stop_event.is_set():
+            self.pingAnAddress()
+            self._stop_event.wait(self.ping_interval_in_seconds)
 
     def startPing(self, blocking=False):
-        pinging_thread = threading.Thread(name="ping thread", target = self.pingTimerThread)
-        pinging_thread.start()
+        self.ping_timer_thread = threading.Thread(name="ping thread", target = self.pingTimerThread)
+        self.ping_timer_thread.start()
         if blocking:
-            pinging_thread.join()
+            self.ping_timer_thread.join()
 
     def stopPing(self):
-        if self.ping_timer_thread is not None:
-            self.ping_timer_thread.cancel()
+        self.continue_pinging = False
+        self._stop_event.set()
         if self.subprocess_p is not None:
             self.subprocess_p.terminate()
-        self.continue_pinging = False
 
 if __name__ == "__main__":
     import signal
@@ -4,10 +4,14 @@ import threading
 import logging
 import traceback
 import concurrent.futures
+import json
+import subprocess
 import yaml
 import os
 
-from ping_address import PeriodicAddressPinger
+import numpy as np
+
+from ping_address import PeriodicAddressPinger, load_yaml_cached
 from motorReader import MotorController
 
 # Configure logging
@@ -19,16 +23,82 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+## orjson is markedly faster on the float-heavy motor payload; fall back
+## to the stdlib when it is not installed
+try:
+    import orjson
+
+    def _json_dumps_bytes(data):
+        return orjson.dumps(data)
+
+except ImportError:
+    def _json_dumps_bytes(data):
+        return json.dumps(data).encode()
+
+## msgpack shrinks the all-floats motor payload to a fraction of its
+## JSON size on the wire; clients opt in via Accept, so it stays optional
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+## Derived views of the config (addresses, motor robots, names) cached per
+## config version so the flexa table is walked once, not once per helper
+_DERIVED_CACHE = {}
+_DERIVED_CACHE_MAX_ENTRIES = 8
+
+
 class RobotConfig:
     """Centralized robot configuration loader"""
-    
+
+    @staticmethod
+    def load_derived(config_path='config.yaml'):
+        """Load the config plus its derived views, cached on (path, mtime_ns).
+
+        A single pass over config['flexa'] fills the address book, the
+        motor-enabled list and the name list together, instead of three
+        separate walks on every instantiation.
+        """
+        try:
+            key = (os.path.abspath(config_path), os.stat(config_path).st_mtime_ns)
+        except OSError:
+            key = None
+        if key is not None:
+            hit = _DERIVED_CACHE.get(key)
+            if hit is not None:
+                return hit
+
+        config = RobotConfig.load_config(config_path)
+        addresses = {}
+        motor_robots = []
+        names = []
+        if config and 'flexa' in config:
+            for robot_id, robot_data in config['flexa'].items():
+                names.append(robot_data['name'])
+                if robot_data.get('ip') and robot_data['ip'] != '127.0.0.1':
+                    addresses[robot_data['name']] = robot_data['ip']
+                if robot_data.get('has_motors', False):
+                    motor_robots.append(robot_data['name'])
+
+        entry = {
+            'config': config,
+            'addresses': addresses,
+            'motor_robots': motor_robots,
+            'names': names,
+        }
+        if key is not None:
+            _DERIVED_CACHE[key] = entry
+            while len(_DERIVED_CACHE) > _DERIVED_CACHE_MAX_ENTRIES:
+                _DERIVED_CACHE.pop(next(iter(_DERIVED_CACHE)))
+        return entry
+
     @staticmethod
     def load_config(config_path='config.yaml'):
         """Load robot configuration from YAML file"""
         try:
-            with open(config_path, 'r') as f:
-                config = yaml.safe_load(f)
-            return config
+            ## Shares the pinger module's cache and JSON sidecar, so warm
+            ## loads skip the YAML parser entirely
+            return load_yaml_cached(config_path)
         except Exception as e:
             logger.error(f"Failed to load config: {e}")
             return None
@@ -43,6 +113,15 @@ class RobotConfig:
                     addresses[robot_data['name']] = robot_data['ip']
         return addresses
     
+    @staticmethod
+    def get_robot_addresses_cached(config_path='config.yaml'):
+        """Robot addresses straight from a config path, cached per version.
+
+        Returns a fresh dict copy so callers may add their own entries
+        (e.g. VPN/RM in the GUI) without touching the cache.
+        """
+        return dict(RobotConfig.load_derived(config_path)['addresses'])
+
     @staticmethod
     def get_motor_enabled_robots(config):
         """Get list of robots with motor capabilities"""
@@ -63,48 +142,53 @@ class RobotConfig:
         return names
 
 class MultiPingChecker:
+    ## Motor data layout: one float32 row per robot instead of nested dicts
+    ## of boxed floats; the dict shape is rebuilt only when a caller asks
+    _MOTOR_NAMES = ('motor1', 'motor2')
+    _MOTOR_FIELDS = ('pos_rad', 'pos_offset', 'vel_rpm', 'vel_rad', 'current')
+
     def __init__(self, address_book=None, config_path='config.yaml'):
-        # Load configuration
-        self.config = RobotConfig.load_config(config_path)
-        
+        # Load configuration together with its derived views
+        derived = RobotConfig.load_derived(config_path)
+        self.config = derived['config']
+
         # If no address book provided, load from config
         if address_book is None:
-            address_book = RobotConfig.get_robot_addresses(self.config)
+            address_book = dict(derived['addresses'])
             logger.info(f"Loaded {len(address_book)} robots from config")
-        
+
         # Get system settings from config
         system_config = self.config.get('system', {}) if self.config else {}
         self.update_interval = system_config.get('update_interval', 1.0)
         self.motor_update_interval = system_config.get('motor_update_interval', 1.0)
-        
-        # Get motor-enabled robots from config
-        self.motor_primary_robots = RobotConfig.get_motor_enabled_robots(self.config)
-        logger.info(f"Motor-enabled robots: {self.motor_primary_robots}")
 
-        # State, keyed by lowercase robot names
+        # Get motor-enabled robots from config, lowercased to match the
+        # state-dict keys (the old list kept config-case names, so the
+        # membership test below could silently miss)
+        self.motor_primary_robots = frozenset(r.lower() for r in derived['motor_robots'])
+        logger.info(f"Motor-enabled robots: {sorted(self.motor_primary_robots)}")
+
+        # State, keyed by lowercase robot names; bulk-built rather than
+        # inserted one robot at a time in the loop below
+        keys = [name.lower() for name in address_book]
         self.dict_of_pingers = {}
-        self.dict_of_ping_status = {}
-        self.dict_of_robot_status = {}
-        self.dict_of_cleaning_device_status = {}
-        self.dict_of_motor_data = {}
+        self.dict_of_ping_status = dict.fromkeys(keys, False)
+        self.dict_of_robot_status = {k: {} for k in keys}
+        self.dict_of_cleaning_device_status = {k: {} for k in keys}
         self.motor_controllers = {}
 
-        # Seed structures and instantiate controllers/pingers
+        # 1) Motor data lives in a single (robots x motors x fields) float32
+        #    buffer; zeros are the same defaults the old nested dicts held
+        self._robot_idx = {k: i for i, k in enumerate(keys)}
+        self._motor_buf = np.zeros(
+            (len(keys), len(self._MOTOR_NAMES), len(self._MOTOR_FIELDS)),
+            dtype=np.float32)
+
+        # Instantiate controllers/pingers
         for name, ip in address_book.items():
             key = name.lower()
 
-            # 1) Default-zero motor data
-            self.dict_of_motor_data[key] = {
-                "motor1": {"pos_rad": 0.0, "pos_offset": 0.0, "vel_rpm": 0.0, "vel_rad": 0.0, "current": 0.0},
-                "motor2": {"pos_rad": 0.0, "pos_offset": 0.0, "vel_rpm": 0.0, "vel_rad": 0.0, "current": 0.0},
-            }
-
-            # 2) Default ping/status slots
-            self.dict_of_ping_status[key] = False
-            self.dict_of_robot_status[key] = {}
-            self.dict_of_cleaning_device_status[key] = {}
-
-            # 3) MotorController - ONLY for motor-enabled robots
+            # 2) MotorController - ONLY for motor-enabled robots
             if key in self.motor_primary_robots:
                 try:
                     mc = MotorController(ssh_host=ip)
@@ -115,37 +199,248 @@ class MultiPingChecker:
             else:
                 logger.debug(f"Skipping MotorController for {key} - not motor-enabled")
 
-            # 4) Pinger (for all robots)
+            # 3) Pinger (for all robots)
             try:
                 p = PeriodicAddressPinger(ip)
                 self.dict_of_pingers[key] = p
             except Exception as e:
                 logger.error(f"Failed pinger init for {key}@{ip}: {e}")
 
+        # Online robots tracked as one bit per key alongside the status
+        # dict, so "who's online" queries are bitwise ops on an int
+        self._keys = list(self.dict_of_pingers)
+        self._key_bit = {k: 1 << i for i, k in enumerate(self._keys)}
+        self._online_mask = 0
+        self._motor_mask = 0
+        for k in self.motor_primary_robots:
+            self._motor_mask |= self._key_bit.get(k, 0)
+
+        # Persistent pool for motor reads; reused every tick instead of
+        # spinning up a fresh executor per interval
+        self._motor_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(3, len(self.motor_primary_robots) or 1),
+            thread_name_prefix='motor')
+
+        # Motor payload version, bumped on every motor/ping mutation. The
+        # encoded body is rebuilt at most once per version, so N pollers
+        # per second cost one encode, not N
+        self._motor_version = 0
+        self._motor_json_cache = (-1, b'')
+        self._motor_msgpack_cache = (-1, b'')
+        self._motor_soa_cache = (-1, b'')
+        self._motor_json_lock = threading.Lock()
+
+        # Fleet-state version plus a condition for push-style consumers:
+        # SSE streams block on wait_for_change instead of polling
+        self._state_version = 0
+        self._change_cond = threading.Condition()
+
         # Thread control
         self.running = True
         self.ping_status_thread = None
         self.motor_update_thread = None
+        self._stop_evt = threading.Event()
+
+    def get_motor_data(self, key):
+        """Build the legacy nested motor dict for one robot from its row."""
+        row = self._motor_buf[self._robot_idx[key]]
+        return {name: {field: float(row[m][j]) for j, field in enumerate(self._MOTOR_FIELDS)}
+                for m, name in enumerate(self._MOTOR_NAMES)}
+
+    def set_motor_data(self, key, motors):
+        """Write one robot's motor dict into its buffer row."""
+        idx = self._robot_idx.get(key)
+        if idx is None or not motors:
+            return
+        for m, name in enumerate(self._MOTOR_NAMES):
+            fields = motors.get(name)
+            if fields:
+                self._motor_buf[idx, m] = [fields.get(f, 0.0) for f in self._MOTOR_FIELDS]
+        self._motor_version += 1
+        self._mark_changed()
+
+    def motor_json_bytes(self):
+        """Encoded motor payload plus its version, rebuilt once per change.
+
+        Returns (body_bytes, version) where the body is the serialized
+        {'motor_data', 'ping_status'} dict. HTTP handlers hand the bytes
+        straight to the response and use the version as a weak ETag, so
+        1Hz polling from N browsers costs one encode per update instead
+        of one per request.
+        """
+        version = self._motor_version
+        cached_version, body = self._motor_json_cache
+        if cached_version != version:
+            with self._motor_json_lock:
+                cached_version, body = self._motor_json_cache
+                if cached_version != version:
+                    body = _json_dumps_bytes({
+                        'motor_data': self.dict_of_motor_data,
+                        'ping_status': self.dict_of_ping_status,
+                    })
+                    self._motor_json_cache = (version, body)
+        return body, version
+
+    def motor_msgpack_bytes(self):
+        """msgpack-encoded motor payload, or (None, -1) when unavailable.
+
+        Same contract and caching as motor_json_bytes; use_single_float
+        packs each reading as 4 bytes instead of JSON's decimal text, so
+        the 1Hz payload shrinks to a fraction of its JSON size for
+        clients that ask for application/msgpack.
+        """
+        if msgpack is None:
+            return None, -1
+        version = self._motor_version
+        cached_version, body = self._motor_msgpack_cache
+        if cached_version != version:
+            with self._motor_json_lock:
+                cached_version, body = self._motor_msgpack_cache
+                if cached_version != version:
+                    body = msgpack.packb({
+                        'motor_data': self.dict_of_motor_data,
+                        'ping_status': self.dict_of_ping_status,
+                    }, use_single_float=True)
+                    self._motor_msgpack_cache = (version, body)
+        return body, version
+
+    def motor_soa_payload(self):
+        """Structure-of-arrays view of the motor buffer.
+
+        Field names are emitted once per motor instead of once per robot
+        per serialization; values are parallel arrays indexed like the
+        'robots' list, sliced straight out of the float32 buffer columns.
+        """
+        robots = list(self._robot_idx)
+        payload = {
+            'robots': robots,
+            'ping_status': [self.dict_of_ping_status.get(k, False) for k in robots],
+        }
+        for m, name in enumerate(self._MOTOR_NAMES):
+            payload[name] = {field: self._motor_buf[:, m, j].tolist()
+                             for j, field in enumerate(self._MOTOR_FIELDS)}
+        return payload
+
+    def motor_soa_json_bytes(self):
+        """Encoded SoA motor payload, cached per version like the others."""
+        version = self._motor_version
+        cached_version, body = self._motor_soa_cache
+        if cached_version != version:
+            with self._motor_json_lock:
+                cached_version, body = self._motor_soa_cache
+                if cached_version != version:
+                    body = _json_dumps_bytes(self.motor_soa_payload())
+                    self._motor_soa_cache = (version, body)
+        return body, version
+
+    @property
+    def dict_of_motor_data(self):
+        """Legacy dict-of-dicts view over the motor buffer, built on access."""
+        return {key: self.get_motor_data(key) for key in self._robot_idx}
+
+    @dict_of_motor_data.setter
+    def dict_of_motor_data(self, new_data):
+        for key, motors in (new_data or {}).items():
+            self.set_motor_data(key, motors)
+
+    def _tick(self):
+        """Batch-ping all robots in one concurrent fan-out.
+
+        Launches every ping subprocess up front and then collects the
+        results, so one interval costs max(timeout) instead of
+        sum(timeout) across robots. Reachability lands directly in
+        dict_of_ping_status - the checker's parallel per-field dicts are
+        the single source of truth - with a mirror onto each pinger for
+        backwards compat.
+        """
+        procs = {}
+        for key, p in self.dict_of_pingers.items():
+            try:
+                procs[key] = subprocess.Popen(
+                    ["ping", "-c", "1", "-W", "5", p.address_to_ping],
+                    stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+            except Exception as e:
+                logger.error(f"Failed to launch ping for {key}: {e}")
+                self._set_reachable(key, False)
+
+        # All subprocesses are already running, so these waits overlap: the
+        # whole collection phase is bounded by the slowest ping, and the
+        # deadline keeps a wedged subprocess from stalling the loop
+        for key, proc in procs.items():
+            try:
+                res = proc.wait(timeout=10)
+                self._set_reachable(key, not res)
+            except subprocess.TimeoutExpired:
+                logger.error(f"Ping for {key} hung, killing it")
+                proc.kill()
+                self._set_reachable(key, False)
+            except Exception as e:
+                logger.error(f"Error collecting ping result for {key}: {e}")
+                self._set_reachable(key, False)
+
+    @property
+    def state_version(self):
+        """Monotonic fleet-state version (ping, status, and motor changes)."""
+        return self._state_version
+
+    def _mark_changed(self):
+        """Bump the fleet-state version and wake blocked stream consumers."""
+        with self._change_cond:
+            self._state_version += 1
+            self._change_cond.notify_all()
+
+    def wait_for_change(self, seen_version, timeout=None):
+        """Block until the fleet state moves past seen_version.
+
+        Returns the current version; equal to seen_version only when the
+        wait timed out with nothing new.
+        """
+        with self._change_cond:
+            self._change_cond.wait_for(
+                lambda: self._state_version != seen_version, timeout)
+            return self._state_version
+
+    def _set_reachable(self, key, reachable):
+        if self.dict_of_ping_status.get(key) != reachable:
+            self._motor_version += 1
+            self._mark_changed()
+        self.dict_of_ping_status[key] = reachable
+        self.dict_of_pingers[key].is_address_reachable = reachable
+        bit = self._key_bit.get(key, 0)
+        if reachable:
+            self._online_mask |= bit
+        else:
+            self._online_mask &= ~bit
 
     def updatePingerStatus(self):
-        """Refresh ping, robot status, and cleaning-device status."""
+        """Refresh robot status and cleaning-device status.
+
+        Reachability is maintained by _tick; this only fills the
+        status-field dicts, so the per-tick GUI/API assembly reads plain
+        dicts instead of chasing per-pinger attributes.
+        """
+        updated = False
         for key, p in self.dict_of_pingers.items():
             try:
-                self.dict_of_ping_status[key] = getattr(p, 'is_address_reachable', False)
                 if hasattr(p, 'assistant') and p.assistant:
                     self.dict_of_robot_status[key] = p.assistant.robotStatus(key)
                     self.dict_of_cleaning_device_status[key] = p.assistant.brushStatus(key) or {}
+                    updated = True
             except Exception as e:
                 logger.error(f"Error in updatePingerStatus for {key}: {e}")
-                self.dict_of_ping_status[key] = False
+                self._set_reachable(key, False)
+        if updated:
+            self._mark_changed()
 
     def updateMotorDataParallel(self):
         """Update motor data for motor-enabled robots in parallel"""
         robots_to_update = []
-        
-        # Collect only motor-enabled robots that are online
+
+        # Collect only motor-enabled robots that are online: one AND on the
+        # masks instead of a dict lookup per motor robot
+        live = self._online_mask & self._motor_mask
         for k in self.motor_primary_robots:
-            if self.dict_of_ping_status.get(k, False):
+            if live & self._key_bit.get(k, 0):
                 motor_controller = self.motor_controllers.get(k)
                 if motor_controller:
                     robots_to_update.append((k, k, motor_controller))
@@ -154,11 +449,10 @@ class MultiPingChecker:
             logger.debug("No motor-enabled robots online")
             return
         
-        logger.info(f"Updating motor data for {len(robots_to_update)} robots: {[r[0] for r in robots_to_update]}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Updating motor data for %d robots: %s",
+                        len(robots_to_update), [r[0] for r in robots_to_update])
         
-        # Use ThreadPoolExecutor for parallel SSH connections
-        max_workers = min(3, len(robots_to_update))
-
         def update_single_robot(robot_data):
             k, robot_key, motor_controller = robot_data
             try:
@@ -167,89 +461,92 @@ class MultiPingChecker:
                 elapsed = time.time() - start_time
                 
                 if motor_data:
-                    self.dict_of_motor_data[k] = motor_data
-                    logger.debug(f"Updated motor data for {k} in {elapsed:.2f}s")
+                    self.set_motor_data(k, motor_data)
+                    logger.debug("Updated motor data for %s in %.2fs", k, elapsed)
                     return True
                 else:
-                    logger.warning(f"No motor data returned for {k} after {elapsed:.2f}s")
+                    logger.warning("No motor data returned for %s after %.2fs", k, elapsed)
                     return False
             except Exception as e:
                 logger.error(f"Error reading motor data for {k}: {e}")
                 return False
         
-        # Execute updates in parallel
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            start_time = time.time()
-            futures = [executor.submit(update_single_robot, robot_data) 
-                      for robot_data in robots_to_update]
-            
-            # Wait for all to complete
-            results = []
-            for future in concurrent.futures.as_completed(futures):
-                try:
-                    result = future.result()
-                    results.append(result)
-                except Exception as e:
-                    logger.error(f"Future exception: {e}")
-                    results.append(False)
-            
-            elapsed = time.time() - start_time
-            successful = sum(1 for r in results if r)
-            logger.info(f"Updated {successful}/{len(robots_to_update)} robots in {elapsed:.2f}s")
+        # Execute updates on the persistent pool
+        start_time = time.time()
+        futures = [self._motor_executor.submit(update_single_robot, robot_data)
+                   for robot_data in robots_to_update]
+
+        # Wait for all to complete
+        results = []
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                result = future.result()
+                results.append(result)
+            except Exception as e:
+                logger.error(f"Future exception: {e}")
+                results.append(False)
+
+        elapsed = time.time() - start_time
+        successful = sum(1 for r in results if r)
+        logger.info("Updated %d/%d robots in %.2fs", successful, len(robots_to_update), elapsed)
 
     def _schedule_ping_status(self):
-        """Thread function for periodic ping-status refresh."""
-        if not self.running:
-            return
-        try:
-            self.updatePingerStatus()
-            online = [k for k, v in self.dict_of_ping_status.items() if v]
-            logger.info(f"Online robots: {online}")
-        except Exception as e:
-            logger.error(f"Error in _schedule_ping_status: {e}")
-        
-        if self.running:
-            self.ping_status_thread = threading.Timer(self.update_interval, self._schedule_ping_status)
-            self.ping_status_thread.daemon = True
-            self.ping_status_thread.start()
+        """Worker loop for periodic ping-status refresh.
+
+        One persistent thread blocked on the stop event between ticks,
+        instead of spawning a new threading.Timer per interval. Setting
+        the event wakes it immediately on shutdown.
+        """
+        while self.running and not self._stop_evt.is_set():
+            t0 = time.monotonic()
+            try:
+                self._tick()
+                self.updatePingerStatus()
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("Online robots: %s",
+                                [k for k in self._keys if self._online_mask & self._key_bit[k]])
+            except Exception as e:
+                logger.error(f"Error in _schedule_ping_status: {e}")
+
+            # Subtract the work time so cadence doesn't drift when a tick
+            # takes close to the interval
+            self._stop_evt.wait(max(0.0, self.update_interval - (time.monotonic() - t0)))
 
     def _schedule_motor_update(self):
-        """Thread function for periodic motor-data refresh."""
-        if not self.running:
-            return
-        try:
-            self.updateMotorDataParallel()
-        except Exception as e:
-            logger.error(f"Error in _schedule_motor_update: {e}")
-        
-        if self.running:
-            self.motor_update_thread = threading.Timer(self.motor_update_interval, self._schedule_motor_update)
-            self.motor_update_thread.daemon = True
-            self.motor_update_thread.start()
+        """Worker loop for periodic motor-data refresh."""
+        while self.running and not self._stop_evt.is_set():
+            t0 = time.monotonic()
+            try:
+                self.updateMotorDataParallel()
+            except Exception as e:
+                logger.error(f"Error in _schedule_motor_update: {e}")
+
+            self._stop_evt.wait(max(0.0, self.motor_update_interval - (time.monotonic() - t0)))
 
     def startPing(self, blocking=False):
-        """Kick off both ping-status and motor-data timers."""
+        """Kick off both ping-status and motor-data workers."""
         self.running = True
-        
-        # Start all pingers
-        for p in self.dict_of_pingers.values():
-            try:
-                p.startPing()
-            except Exception as e:
-                logger.error(f"Error starting pinger: {e}")
+        self._stop_evt.clear()
+
+        # Pinging is batched in _tick(), so the per-pinger threads are no
+        # longer started here; each interval fans out all pings at once.
 
         # Start update threads
-        threading.Thread(target=self._schedule_ping_status, daemon=True).start()
-        threading.Thread(target=self._schedule_motor_update, daemon=True).start()
+        self.ping_status_thread = threading.Thread(target=self._schedule_ping_status, daemon=True)
+        self.motor_update_thread = threading.Thread(target=self._schedule_motor_update, daemon=True)
+        self.ping_status_thread.start()
+        self.motor_update_thread.start()
 
         if blocking and self.ping_status_thread:
             self.ping_status_thread.join()
 
     def stopPing(self):
-        """Cancel timers and stop pingers."""
+        """Stop the worker loops and pingers."""
         logger.info("Stopping MultiPingChecker")
         self.running = False
-        
+        # Wake both workers instantly instead of waiting out the interval
+        self._stop_evt.set()
+
         # Stop all pingers
         for p in self.dict_of_pingers.values():
             try:
@@ -257,11 +554,7 @@ class MultiPingChecker:
             except:
                 pass
 
-        # Cancel timers
-        if self.ping_status_thread:
-            self.ping_status_thread.cancel()
-        if self.motor_update_thread:
-            self.motor_update_thread.cancel()
+        self._motor_executor.shutdown(wait=False)
 
 if __name__ == "__main__":
     import signal
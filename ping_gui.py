@@ -2,6 +2,7 @@ import cv2 # version 4.3.0.38
 import numpy as np
 import math
 import json
+import queue
 from datetime import datetime
 
 class PingerGUI():
@@ -26,7 +27,35 @@ class PingerGUI():
         self.num_in_width = 1
         self.window_height = (self.square_length + self.padding)*self.num_in_height
         self.window_width = self.padding + self.num_in_width*(self.rectangle_length + self.square_length + 2*self.padding)
-        self.img = 255*np.ones((self.window_height, self.window_width,3), np.uint8)
+        ## Static background kept pristine; rows are painted over it and
+        ## only repainted when their state actually changes
+        self._bg = 255*np.ones((self.window_height, self.window_width,3), np.uint8)
+        self.img = self._bg.copy()
+        ## Last drawn state per base, so unchanged rows are skipped
+        self._last_state = {}
+        ## Per-base (fingerprint, result) pairs so determine_color only
+        ## re-runs its branch tree when the underlying status changed
+        self._color_cache = {}
+        ## Set whenever new status data arrives; main() only repaints and
+        ## pushes a frame to the window when this is set
+        self._dirty = True
+        ## Status updates from the checker thread are queued and applied on
+        ## the GUI thread, which coalesces bursts into a single redraw
+        self._q = queue.Queue()
+        ## Row geometry never changes after construction, so compute it once:
+        ## (sqtl, sqbr, nameCoord, tl, br, textCoord, doggoCoord) per row
+        self._row_geom = []
+        for i in range(self.num_in_height):
+            pad = self.padding + i*(self.padding + self.square_length)
+            self._row_geom.append((
+                (self.padding, pad),
+                (self.padding + self.square_length, pad + self.square_length),
+                (self.padding + 1, pad + 77*self.square_length//128),
+                (self.square_length + 2*self.padding, pad),
+                (self.square_length + self.padding + self.rectangle_length, pad + self.square_length),
+                (self.square_length + 2*self.padding + 1, pad + 3*self.square_length//8),
+                (self.square_length + 2*self.padding + 1, pad + 7*self.square_length//8),
+            ))
         self.image_window_name = image_window_name
         self.continue_gui = True
         ## Defines all colour names with their associated BGR
@@ -48,13 +77,36 @@ class PingerGUI():
         '''
         Returns 4 values, baseColour(str), statusColour(str), textColour(str), robot_status(dict)
 
-        self.determine_color(base) Determines the colour based on the robot status. 
+        self.determine_color(base) Determines the colour based on the robot status.
         Need to pass in base as parameter, need base to check ping status
 
         baseColour refers to block on the left
         statusColour refers to the block on the right
-        textColour refers to the text on the right, text on the left is a constant white       
+        textColour refers to the text on the right, text on the left is a constant white
         '''
+        ## Fingerprint every field the colours and messages depend on; if
+        ## it matches the last call for this base, skip the branch tree
+        rs = self.dict_of_robot_status.get(base) or {}
+        cs = self.dict_of_cleaning_devices.get(base)
+        doggo = rs.get('watch_doggo_error_rm')
+        try:
+            doggo_sig = (len(doggo), doggo[0]['error_code']) if doggo else None
+        except (TypeError, KeyError, IndexError):
+            doggo_sig = None
+        fingerprint = (self.dict_of_ping_status.get(base), len(rs),
+                       rs.get('battery_soc'), rs.get('soft_estop_engaged'),
+                       rs.get('working_status'),
+                       cs.get('front') if isinstance(cs, dict) else None,
+                       cs.get('rear') if isinstance(cs, dict) else None,
+                       doggo_sig)
+        hit = self._color_cache.get(base)
+        if hit is not None and hit[0] == fingerprint:
+            return hit[1]
+        result = self._compute_color(base)
+        self._color_cache[base] = (fingerprint, result)
+        return result
+
+    def _compute_color(self, base):
         ## Default colours (when offline)
         baseColour = "blank"
         textColour = 'white'
@@ -80,47 +132,31 @@ class PingerGUI():
                 battery = robot_status['battery_soc']
                 estop = robot_status['soft_estop_engaged']
                 workingStatus = robot_status['working_status']
-                good = ['Cleaning', 'Navigation', 'Mapping', 'Manual']
-
-                try:
-                    rearCurrent = cleaning_device_status['rear']
-                    frontCurrent = cleaning_device_status['front']
-                
-                except TypeError as e:
-                    rearCurrent = "None"
-                    frontCurrent = "None"
-                    print("Var: ", rearCurrent, frontCurrent)
-                    print(e)
-                    pass
 
                 ## Check estop, set status colour
                 if estop or "error" in workingStatus.lower():
                     ## Red if any error
                     statusColour = "red"
 
-                elif workingStatus in good:
+                elif workingStatus in self._GOOD:
                     ## Green if good
                     statusColour = "green"
 
                 else:
                     ## For anything else
                     statusColour = "navy"
-                
-                ## Check cleaning devices
-                if base == 'Base-B2':
-                    if (type(rearCurrent) == float) and (rearCurrent > 0.6):
-                        ## rearCurrent has a valid type and more than 0.6
-                        baseColour = "green"
-                    else:
-                        baseColour = "navy"
 
+                ## Check cleaning devices: which current matters and its
+                ## threshold are data, not a per-base branch
+                field, threshold = self._BASE_CLEAN_RULES.get(base, self._DEFAULT_CLEAN_RULE)
+                try:
+                    current = cleaning_device_status.get(field)
+                except AttributeError:
+                    current = None
+                if isinstance(current, (int, float)) and current > threshold:
+                    baseColour = "green"
                 else:
-                    if (type(frontCurrent) == float) and (frontCurrent > 0.3):
-                        ## frontCurrent has a valid type and more than 0.3
-                        baseColour = "green"
-
-                    else:
-                        baseColour = "navy"
+                    baseColour = "navy"
 
 
         except KeyError:
@@ -133,108 +169,105 @@ class PingerGUI():
         return baseColour, statusColour, textColour, robot_status
 
     def redraw(self):
+        ## Bind the per-row lookups once; the loop body touches each of
+        ## these several times per row
+        put, rect = cv2.putText, cv2.rectangle
+        font, aa = cv2.FONT_HERSHEY_TRIPLEX, cv2.LINE_AA
+        cmap = self.color_dict
+        white = cmap['white']
+        geom = self._row_geom
+        last_state = self._last_state
+        img = self.img
         for i, base in enumerate(self.dict_of_addresses):
             baseColour, statusColour, textColour, robot_status = self.determine_color(base)
 
+            ## Rectangle text content; offline robots are the common case,
+            ## so check with .get instead of raising KeyError every frame
+            battery = robot_status.get('battery_soc')
+            if battery is not None:
+                statusMessage = "Batt: {0:>3}% | Estop: {1:<7} | Working Status: {2:<11}".format(battery, str(robot_status.get('soft_estop_engaged')), robot_status.get('working_status'))
+            else:
+                statusMessage = robot_status.get("isOnline", "No Connection")
+
+            doggo_rm = robot_status.get('watch_doggo_error_rm')
+            if doggo_rm:
+                doggoMessage = "Error {0}".format(self.unpack_doggo_error(doggo_rm))
+                ## Black on yellow to keep the text readable
+                doggoColour = "black" if statusColour == "yellow" else "yellow"
+            else:
+                doggoMessage = 'No errors'
+                ## Doggo colour defaults to standard colour
+                doggoColour = textColour
+
+            ## Skip rows whose full drawn state is unchanged since the last
+            ## frame; a typical tick repaints 0-1 rows instead of all N
+            state = (baseColour, statusColour, textColour, statusMessage, doggoMessage, doggoColour)
+            if last_state.get(base) == state:
+                continue
+            last_state[base] = state
+
             ## Start here to change the layout of the GUI
             # Square top left and bottom right, panel refers to the entire line
 
             ## To make the robot name fit in the square
             if base == "Base-B2":
-                base = "B2"
-            
+                label = "B2"
+
             elif base == "Base-B3":
-                base = "B3"
+                label = "B3"
 
             else:
-                pass
+                label = base
 
-            panel_top_pad = (self.padding + i*(self.padding + self.square_length))
-            sqtl = (self.padding, panel_top_pad)
-            sqbr = (self.padding + self.square_length, panel_top_pad + self.square_length)
-            textCoord = (self.padding + 1, panel_top_pad + 77*self.square_length//128)
-            cv2.rectangle(self.img, sqtl, sqbr, self.color_dict[baseColour], -1)
-            self.img = cv2.putText(self.img, base, textCoord, cv2.FONT_HERSHEY_TRIPLEX ,
-                                   0.5, self.color_dict['white'], 1, cv2.LINE_AA)
+            ## putText/rectangle draw in place, so no rebinding of self.img
+            sqtl, sqbr, nameCoord, tl, br, textCoord, doggoCoord = geom[i]
+            rect(img, sqtl, sqbr, cmap[baseColour], -1)
+            put(img, label, nameCoord, font, 0.5, white, 1, aa)
 
             ## Rectangle top left and bottom right
-            try:
-                statusMessage = "Batt: {0:>3}% | Estop: {1:<7} | Working Status: {2:<11}".format(robot_status['battery_soc'], str(robot_status['soft_estop_engaged']), robot_status['working_status'])
+            rect(img, tl, br, cmap[statusColour], -1)
+            put(img, statusMessage, textCoord, font, 0.6, cmap[textColour], 1, aa)
+            put(img, doggoMessage, doggoCoord, font, 0.6, cmap[doggoColour], 1, aa)
 
-                ## Terminal output as backup in case GUI does not update
-                #print(f"{datetime.now().time()} {base:<6} {statusMessage}")
-                
-            except:
-                statusMessage = robot_status["isOnline"]
-
-            try:
-                doggoMessage = "Error {0}".format(self.unpack_doggo_error(robot_status['watch_doggo_error_rm']))
-                if statusColour == "yellow":
-                    ## To make text readable
-                    doggoColour = "black"
-                else:
-                    doggoColour = "yellow"
-
-                ## Terminal output as a backup in case GUI does not update
-                #print(doggoMessage)
-
-            except:
-                doggoMessage = 'No errors'
-                ## Doggo colour defaults to standard colour
-                doggoColour = textColour
-
-            tl = (self.square_length + 2*self.padding, panel_top_pad)
-            br = (self.square_length + self.padding + self.rectangle_length, panel_top_pad + self.square_length)
-            textCoord = (self.square_length + 2*self.padding + 1, panel_top_pad + 3*self.square_length//8)
-            doggoCoord = (self.square_length + 2*self.padding + 1, panel_top_pad + 7*self.square_length//8)
-            cv2.rectangle(self.img, tl, br, self.color_dict[statusColour], -1)
-            self.img = cv2.putText(self.img, statusMessage, textCoord, cv2.FONT_HERSHEY_TRIPLEX ,
-                                   0.6, self.color_dict[textColour], 1, cv2.LINE_AA)
-            self.img = cv2.putText(self.img, doggoMessage, doggoCoord, cv2.FONT_HERSHEY_TRIPLEX,
-                                    0.6, self.color_dict[doggoColour], 1, cv2.LINE_AA)
+    ## Low error refers to lower priority errors, add to the set
+    _LOW_ERROR = frozenset({'1201'})
+    ## Truncated errors, for when the message is too long
+    _TRUNC_ERROR = {'3605': "Module MCU disconnected"}
 
     def unpack_doggo_error(self, errorRm:list) -> str:
-        ## Unpacks rm_message in watch_doggo_error_rm
-        ## Low error refers to lower priority errors, add to the array
-        lowError = ['1201']
-        ## Truncated errors, for when the message is too long
-        truncError = {'3605':"Module MCU disconnected"}
-        i = 0
-        #print(errorRm)
-        while (errorRm[i]['error_code'] in lowError):
-            ## Get next error
-            if i < len(errorRm):
-                i += 1
-            
-            else:
-                i -= 1
-                break
-        
-        rmMessage = errorRm[i]['rm_message']
-        errorCode = errorRm[i]['error_code']
-        if errorCode in truncError.keys():
-            rmMessage = truncError[errorCode]
-        
-        message = "{0}: {1}".format(errorCode, rmMessage)
-        return message
+        ## Unpacks rm_message in watch_doggo_error_rm: report the first
+        ## non-low-priority error, falling back to the last entry when every
+        ## error is low priority (the old index walk could run past the end)
+        entry = next((e for e in errorRm if e['error_code'] not in self._LOW_ERROR), errorRm[-1])
+        errorCode = entry['error_code']
+        rmMessage = self._TRUNC_ERROR.get(errorCode, entry['rm_message'])
+        return "{0}: {1}".format(errorCode, rmMessage)
 
     def redraw_and_show(self):
         self.redraw()
         cv2.imshow(self.image_window_name, self.img)
 
-    def update_ping_status(self, new_dict_of_ping_status, new_dict_of_robot_status, new_dict_of_cleaning_device_status):
-        for k in self.dict_of_ping_status:
-            ping_status = new_dict_of_ping_status.get(k, None)
-            self.dict_of_robot_status = new_dict_of_robot_status
-            self.dict_of_cleaning_devices = new_dict_of_cleaning_device_status
-            if ping_status is None:
-                self.dict_of_ping_status[k] = "unknown"
-            else:
-                self.dict_of_ping_status[k] = "on" if ping_status else "off"
-            
+    ## Maps raw ping results straight to display states
+    _PING_MAP = {True: "on", False: "off", None: "unknown"}
+    ## Working statuses considered healthy
+    _GOOD = frozenset({'Cleaning', 'Navigation', 'Mapping', 'Manual'})
+    ## Which cleaning-device current to check per base, with its threshold
+    _BASE_CLEAN_RULES = {'Base-B2': ('rear', 0.6)}
+    _DEFAULT_CLEAN_RULE = ('front', 0.3)
 
-    def update_and_redraw_and_show(self, new_dict_of_ping_status):
-        self.update_ping_status(new_dict_of_ping_status)
+    def update_ping_status(self, new_dict_of_ping_status, new_dict_of_robot_status, new_dict_of_cleaning_device_status):
+        self.dict_of_robot_status = new_dict_of_robot_status
+        self.dict_of_cleaning_devices = new_dict_of_cleaning_device_status
+        get = new_dict_of_ping_status.get
+        self.dict_of_ping_status = {k: self._PING_MAP[get(k)] for k in self.dict_of_ping_status}
+        self._dirty = True
+
+    def submit_update(self, new_dict_of_ping_status, new_dict_of_robot_status, new_dict_of_cleaning_device_status):
+        """Queue a status update for the GUI thread to apply."""
+        self._q.put((new_dict_of_ping_status, new_dict_of_robot_status, new_dict_of_cleaning_device_status))
+
+    def update_and_redraw_and_show(self, new_dict_of_ping_status, new_dict_of_robot_status, new_dict_of_cleaning_device_status):
+        self.update_ping_status(new_dict_of_ping_status, new_dict_of_robot_status, new_dict_of_cleaning_device_status)
         self.redraw_and_show()
 
     def stopGUI(self):
@@ -244,9 +277,26 @@ class PingerGUI():
         cv2.namedWindow(self.image_window_name, cv2.WINDOW_NORMAL)
 
         while self.continue_gui:
-            self.redraw_and_show()
+            ## Block briefly for a queued update, then drain the queue so a
+            ## burst of updates costs one redraw instead of one each
+            try:
+                state = self._q.get(timeout=0.05)
+                while True:
+                    try:
+                        state = self._q.get_nowait()
+                    except queue.Empty:
+                        break
+                self.update_ping_status(*state)
+            except queue.Empty:
+                pass
+
+            ## Only repaint when status data actually changed; waitKey still
+            ## runs every pass so the window keeps pumping events
+            if self._dirty:
+                self._dirty = False
+                self.redraw_and_show()
             # close if window closes with [x], or if 'q' is pressed on keyboard
-            if ((cv2.waitKey(1000) == ord('q')) or (cv2.getWindowProperty(self.image_window_name, cv2.WND_PROP_VISIBLE) < 1)):
+            if ((cv2.waitKey(1) == ord('q')) or (cv2.getWindowProperty(self.image_window_name, cv2.WND_PROP_VISIBLE) < 1)):
                 self.continue_gui = False
                 break
 
@@ -1,5 +1,13 @@
+import concurrent.futures
+import copy
+import fcntl
 import json
+import time
+import types
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from collections import OrderedDict
 from datetime import datetime
 import yaml
 import os
@@ -7,10 +15,81 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+## Prefer the libyaml C loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+## orjson is markedly faster on the log-file shapes; fall back to the
+## stdlib when it is not installed
+try:
+    import orjson
+
+    def _json_loads(raw):
+        return orjson.loads(raw)
+
+    def _json_dumps_bytes(data):
+        return orjson.dumps(data)
+
+except ImportError:
+    def _json_loads(raw):
+        return json.loads(raw)
+
+    def _json_dumps_bytes(data):
+        return json.dumps(data).encode()
+
 URL = os.environ.get("API_BASE_URL", "http://127.0.0.1:8090/")
 AUTHKEY = {"Authorization": os.environ.get("API_AUTH_KEY", "enter-your-api-key")}
 CONFIGPATH = 'config.yaml'
 
+## List of commands and their corresponding api routes; static, so built
+## once and shared read-only across instances
+_ROUTE_DICT = types.MappingProxyType({
+    "start charge": "start_charging",
+    "is online": "Online",
+    "release estop": "reset_soft_estop",
+    "device status": "cleaning_device_status",
+    "back to dock": "navigate_back_to_dock",
+    "remaining goals": "goal_queue_size",
+    "rm info": "get_robot_info_rm",
+    "battery": "battery_soc",
+    "cleaning stats": "cleaning_stats",
+    "current map": "current_map"
+})
+
+## Parsed config shared at module level; keyed on file mtime+size so
+## building another RmHelper reuses the parse instead of re-reading YAML
+_CONFIG_CACHE = {}
+
+
+def _load_robot_names():
+    st = os.stat(CONFIGPATH)
+    key = (st.st_mtime_ns, st.st_size)
+    if _CONFIG_CACHE.get('key') == key:
+        return _CONFIG_CACHE['robot_names']
+
+    ## Cold path: prefer the pre-parsed JSON sidecar the pinger modules
+    ## maintain next to the YAML, and skip the YAML parser entirely when
+    ## it is still fresh
+    config = None
+    sidecar = CONFIGPATH + '.json'
+    try:
+        if os.stat(sidecar).st_mtime >= st.st_mtime:
+            with open(sidecar, 'rb') as f:
+                config = _json_loads(f.read())
+    except (OSError, ValueError):
+        config = None
+
+    if config is None:
+        with open(CONFIGPATH, 'r') as f:
+            config = yaml.load(f, Loader=_YamlLoader)
+    robot_names = [robot_data['name'] for robot_data in config.get('flexa', {}).values()]
+
+    _CONFIG_CACHE['key'] = key
+    _CONFIG_CACHE['robot_names'] = robot_names
+    return robot_names
+
 class RmHelper():
     def __init__(self) -> None:
         """
@@ -53,44 +132,76 @@ class RmHelper():
             }
         }
         """
+        ## One keep-alive session shared by every API call, so polling
+        ## reuses pooled TCP connections instead of handshaking per request
+        self._session = requests.Session()
+        self._session.headers.update(AUTHKEY)
+        ## Retry transient gateway errors with backoff at the transport
+        ## layer, instead of surfacing every blip to the polling loops
+        ## raise_on_status=False hands the final 502/503/504 response back
+        ## to _post (which logs it) instead of raising RetryError past the
+        ## handlers that expect a response
+        retries = Retry(total=2, backoff_factor=0.2,
+                        status_forcelist=[502, 503, 504],
+                        allowed_methods=['POST'],
+                        raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retries)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+
         ## Load robot configuration
         self._loadRobotConfig()
-        
+
+        ## Build the log template once; _generateLogTemplate hands out
+        ## deep copies of this rather than rebuilding the nested dict
+        self._logTemplate = {
+            "API Errors": {"502": []},
+            "Robot Errors": {robot_name: [] for robot_name in self.robot_names}
+        }
+        self._robotNameSet = frozenset(self.robot_names)
+
+        ## Resolve the log directory next to this file and create it up
+        ## front; without it a clean checkout hit FileNotFoundError on the
+        ## first write and recursed through the fallback-log path forever
+        self._logDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs')
+        os.makedirs(self._logDir, exist_ok=True)
+
         ## Initialise all private attributes
         self.__logpath = ""
         self.__logs = {}
+        ## Date the in-memory logs belong to; logs only reload from disk
+        ## when the day rolls over to a new log file
+        self.__logdate = ""
+        ## When the date boundary was last checked; rechecked once a minute
+        ## rather than formatting datetime.now() on every log access
+        self._todayCheckAt = 0.0
+        ## Set when log entries are appended without being written out yet;
+        ## flushed in one dump at the end of a polling pass
+        self._logsDirty = False
+        ## mtime of the log file when it was last loaded or dumped, so a
+        ## flush from another process is picked up instead of served stale
+        self._logsMtime = None
 
         ## Initialise by getting a copy of the logs
         self._refreshLogs()
-        self.estopTracker = {} #dict of number of times robot estop was released
+        ## Number of times each robot's estop was auto-released; kept as an
+        ## LRU bounded to the configured fleet size so unknown names cannot
+        ## grow it without limit over a long uptime
+        self.estopTracker = OrderedDict()
 
         ## 1201 is motor error, the rest is overcurrent for the diff components, 1416 and 1417 are overtemp
-        ## This list contains all auto-release estops
-        self.estopErrors = ['1201', '1412', '1413', '1414', '1415', '1416', '1417']
-        ## List of commands and their corresponding api routes
-        self.routeDict = {
-            "start charge":"start_charging",
-            "is online":"Online",
-            "release estop":"reset_soft_estop",
-            "device status":"cleaning_device_status",
-            "back to dock":"navigate_back_to_dock",
-            "remaining goals":"goal_queue_size",
-            "rm info":"get_robot_info_rm",
-            "battery":"battery_soc",
-            "cleaning stats":"cleaning_stats",
-            "current map":"current_map"
-        }
+        ## This set contains all auto-release estops
+        self.estopErrors = frozenset({'1201', '1412', '1413', '1414', '1415', '1416', '1417'})
+        ## Overtemp errors are never auto-released
+        self._overtempCodes = frozenset({'1416', '1417'})
+        ## Commands and their corresponding api routes, shared module-wide
+        self.routeDict = _ROUTE_DICT
 
     def _loadRobotConfig(self):
-        """Load robot names from config.yaml"""
+        """Load robot names from config.yaml (cached across instances)"""
         try:
-            with open(CONFIGPATH, 'r') as f:
-                config = yaml.safe_load(f)
-                self.robot_names = []
-                if 'flexa' in config:
-                    for robot_id, robot_data in config['flexa'].items():
-                        self.robot_names.append(robot_data['name'])
-                print(f"Loaded {len(self.robot_names)} robots from config")
+            self.robot_names = list(_load_robot_names())
+            print(f"Loaded {len(self.robot_names)} robots from config")
         except Exception as e:
             print(f"Error loading robot config: {e}")
             # Fallback to default robots if config fails
@@ -100,30 +211,20 @@ class RmHelper():
 
     def _generateLogTemplate(self):
         """Generate log template based on configured robots"""
-        template = {
-            "API Errors": {"502": []},
-            "Robot Errors": {}
-        }
-        
-        # Add each robot to the template
-        for robot_name in self.robot_names:
-            template["Robot Errors"][robot_name] = []
-            
-        return template
+        return copy.deepcopy(self._logTemplate)
 
     ## File handling
     def _loadJson(self, filepath, template = None) -> dict:
         ## If file exists, load the file
         try:
-            file = open(filepath, 'r')
-            data = json.load(file)
+            file = open(filepath, 'rb')
+            data = _json_loads(file.read())
             file.close()
             
             # Ensure all configured robots exist in the log file
             if "Robot Errors" in data:
-                for robot_name in self.robot_names:
-                    if robot_name not in data["Robot Errors"]:
-                        data["Robot Errors"][robot_name] = []
+                for robot_name in self._robotNameSet - data["Robot Errors"].keys():
+                    data["Robot Errors"][robot_name] = []
             
             return data
 
@@ -139,21 +240,25 @@ class RmHelper():
             
             ## if there's an error with the file, use fallback to make sure logs still get recorded, then RM can remedy
             ## until a permanent fix has been implemented (see top of this file)
-            return self._loadJson('logs/fallbackLog.json')
+            return self._loadJson(os.path.join(self._logDir, 'fallbackLog.json'))
     
     def _dumpJson(self, filepath, data) -> None:
-        file = open(filepath, 'r+')
-        json.dump(data, file)
-        file.close
+        ## Binary mode since the serializer hands back bytes. The exclusive
+        ## flock keeps a concurrent writer in another process from
+        ## interleaving with this dump; truncate only after the lock is held
+        ## so readers never see a half-written file
+        with open(filepath, 'a+b') as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            file.seek(0)
+            file.truncate()
+            file.write(_json_dumps_bytes(data))
 
     def _makeJson(self, filepath, template = None) -> None:
-        file = open(filepath, 'w')
         if not template:
             ## Generate template dynamically based on configured robots
             template = self._generateLogTemplate()
-        
-        json.dump(template, file)
-        file.close()
+
+        self._dumpJson(filepath, template)
 
     ## Logging
     def getLogPath(self) -> str:
@@ -164,14 +269,35 @@ class RmHelper():
 
     def getLogs(self) -> dict:
         ## Use this method for getting updated logs
-        ## Refresh the logs before returning so that it is always updated to the latest ver.
-        self._refreshLogs()
+        ## self.__logs is authoritative in memory; only re-read the file
+        ## when the date (and therefore the log file) has changed, and only
+        ## look at the clock for that once a minute
+        now = time.monotonic()
+        if now - self._todayCheckAt > 60:
+            self._todayCheckAt = now
+            if str(datetime.now())[:10] != self.__logdate:
+                self._refreshLogs()
+        ## Another writer (helper in a different process) may have flushed
+        ## since we last touched the file; reload when our copy is clean so
+        ## the dashboard never serves a stale snapshot. Dirty entries keep
+        ## the in-memory copy authoritative until the next flush.
+        if not self._logsDirty and self._fileMtime() != self._logsMtime:
+            self._refreshLogs()
         return self.__logs
-    
+
+    def _fileMtime(self):
+        try:
+            return os.stat(self.getLogPath()).st_mtime_ns
+        except OSError:
+            return None
+
     def _refreshLogs(self) -> None:
         ## Sets the logpath and loads the logs into self.__logs
-        self.setLogPath("logs/log" + str(datetime.now())[:10] + ".json")
+        today = str(datetime.now())[:10]
+        self.setLogPath(os.path.join(self._logDir, "log" + today + ".json"))
         self.__logs = self._loadJson(self.getLogPath())
+        self.__logdate = today
+        self._logsMtime = self._fileMtime()
     
     def updateLogs(self) -> bool:
         """
@@ -185,49 +311,71 @@ class RmHelper():
         print(self.getLogPath())
         try:
             self._dumpJson(self.getLogPath(), self.__logs)
+            self._logsDirty = False
+            self._logsMtime = self._fileMtime()
             return True
-        
+
         except Exception as e:
             print(f"rmHelper.py failed to dump JSON!\nException: {e}")
             ## Failed to dump json
             return False
 
+    def flushLogs(self) -> bool:
+        """Write the logs out only if something was appended since the last dump"""
+        if not self._logsDirty:
+            return True
+        return self.updateLogs()
+
     ## API handler
+    ## Split connect/read timeout: fail fast when the API server is down,
+    ## allow slow commands to finish, and never hang a polling thread
+    _POST_TIMEOUT = (3, 30)
+
+    def _post(self, cmd, content):
+        """Shared transport for apiCall/_apiCallJson, including 502 logging"""
+        response = self._session.post(URL + cmd, json = content,
+                                      timeout = self._POST_TIMEOUT)
+
+        ## Logs API errors with status code 502
+        if (response.status_code == 502):
+            ## Only touch the logs on the error path; the common case
+            ## should not pay for a log lookup per request
+            logs = self.getLogs()
+            now = datetime.now()
+            ## Times is an array of the number of times Error 502 was thrown
+            ## (appending mutates the logs in place; the old rebind of
+            ## logs["API Errors"] to the list clobbered the dict shape)
+            logs["API Errors"]["502"].append(now.strftime("%d/%m/%y %H:%M:%S"))
+            ## Mark dirty; the batch flush at the end of the polling
+            ## pass commits it instead of a write per 502
+            self._logsDirty = True
+
+        return response
+
     def apiCall(self, cmd, content) -> str:
         """
         Robot name should be included in the content as part of the params for API cmd
-        
+
         self.apiCall() will handle any exceptions from requests, no need to do handling above this
         """
-        logs = self.getLogs()
         try:
-            url = URL + cmd
-            response = requests.post(url, headers = AUTHKEY, json = content)
-
-            ## Logs API errors with status code 502
-            if (response.status_code == 502):
-                now = datetime.now()
-                ## Times is an array of the number of times Error 502 was thrown
-                times = logs["API Errors"]["502"]
-                times.append(now)
-                ## Update temp logs with the new time
-                logs["API Errors"] = times
-                ## Commit changes on the file
-                self.updateLogs()
-
-            return response.text
-        
+            return self._post(cmd, content).text
+
         except requests.exceptions.ReadTimeout:
             ## Unable to get a response from API server
             return "Failed to connect to API"
+
+    def _apiCallJson(self, cmd, content) -> dict:
+        """
+        Parsed-body variant of apiCall: returns Response.json() directly,
+        skipping the text decode plus json.loads round-trip per call.
+        Request and decode errors propagate to the caller
+        """
+        return self._post(cmd, content).json()
         
     def unpackDoggo(self, doggoError) -> list:
-        ## Returns an array error codes from doggo error
-        codes = []
-        for i in range(len(doggoError)):
-            codes.append(doggoError[i]['error_code'])
-
-        return codes
+        ## Returns an array of error codes from doggo error
+        return [error['error_code'] for error in doggoError]
 
     ## Specific API calls
     ## API calls with no additional params (apart from robot name), wrapper for self.apiCall()
@@ -244,12 +392,13 @@ class RmHelper():
         cmd is mapped in attribute self.routeDict, initialised on instantiation
         """
         try:
-            response = json.loads(self.apiCall(self.routeDict[cmd], {"robot_name":robotName}))
-            return response
-        
+            route = self.routeDict[cmd]
+
         except KeyError:
             ## Invalid route
             raise KeyError
+
+        return self._apiCallJson(route, {"robot_name":robotName})
         
     ## Get Cleaning Brush Status
     def brushStatus(self, robotName:str) -> dict:
@@ -307,14 +456,43 @@ class RmHelper():
 
         return response
     
+    def pollAllRobots(self) -> dict:
+        """
+        Polls self.robotStatus() for every configured robot concurrently
+
+        Returns {robot_name: status dict}. The per-robot API chains overlap
+        on the shared session's connection pool, so a full fleet poll costs
+        roughly one robot's round-trips instead of the sum of all of them
+        """
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(32, len(self.robot_names) or 1)) as pool:
+            return dict(zip(self.robot_names, pool.map(self.robotStatus, self.robot_names)))
+
+    def _quickStatus(self, robotName: str) -> dict:
+        """
+        Status-only fetch over the single 'rm info' endpoint
+
+        Returns {} on any failure. Unlike self.robotStatus() this skips the
+        device-status call and the estop/autoRM handling, so callers that
+        only render the coarse status pay one HTTP round-trip
+        """
+        try:
+            return self.generalAPI("rm info", robotName)["result"]
+
+        except Exception:
+            return {}
+
     def getWorkingStatus(self, robotName: str) -> str:
         """
-        Returns the working status of the robot. 
+        Returns the working status of the robot.
         Status could be one of: 'cleaning', 'idle', 'charging', or 'navigation'.
         """
         try:
-            # Call API to get the robot status
-            status = self.robotStatus(robotName)  # This fetches robot status
+            # Only the coarse flags are needed here, so try the single
+            # endpoint first; fall back to the full status chain when it
+            # fails (which also resolves the online check)
+            status = self._quickStatus(robotName)
+            if not status:
+                status = self.robotStatus(robotName)
             # Depending on the robot's status, return the appropriate working status
             if status.get('isOnline') == 'NA':
                 return 'Offline'
@@ -341,12 +519,15 @@ class RmHelper():
         ## Checks if robot is being tracked for auto estop release
         ## Robot is being tracked
         if robotName in self.estopTracker:
-            ## Do nothing
-            pass
+            ## Refresh its LRU position
+            self.estopTracker.move_to_end(robotName)
 
         else:
-            ## Robot is not being tracked, add to tracker
+            ## Robot is not being tracked, add to tracker and evict the
+            ## stalest entry if the tracker outgrew the fleet
             self.estopTracker[robotName] = 0
+            while len(self.estopTracker) > max(len(self.robot_names), 1):
+                self.estopTracker.popitem(last=False)
         
         print("The dictionary is now", self.estopTracker)
         estopCount = self.estopTracker[robotName]
@@ -394,22 +575,28 @@ class RmHelper():
         """
 
         print("\nAutoRM engaged")
-        codes = self.unpackDoggo(response['watch_doggo_error_rm'])
+        ## A doggo burst often repeats the same code; dedupe (preserving
+        ## first-occurrence order) so each unique code is released and
+        ## logged once per pass
+        codes = list(dict.fromkeys(self.unpackDoggo(response['watch_doggo_error_rm'])))
         logs = self.getLogs()
 
+        ## All codes in the burst share one timestamp; one clock read and
+        ## one strftime per pass instead of per code
+        now = datetime.now()
+        nowStr = now.strftime("%d/%m/%y %H:%M:%S")
+
         for code in codes:
-            now = datetime.now()
-            
             # Ensure the robot exists in the logs
             if robotName not in logs["Robot Errors"]:
                 logs["Robot Errors"][robotName] = []
-                
+
             times = logs["Robot Errors"][robotName]
-            errorLog = ["[NOT RELEASED] Error " + code, now.strftime("%d/%m/%y %H:%M:%S")]
+            errorLog = ["[NOT RELEASED] Error " + code, nowStr]
             ## Only auto release estops for specified error codes
             if code in self.estopErrors:
                 ## Codes 1416 and 1417 are overtemp errors, do not auto-release
-                if code in ['1416', '1417']:
+                if code in self._overtempCodes:
                     print(robotName, "roller over temperature, release estop manually")
 
                 elif self.estopTracker[robotName] >= 3:
@@ -419,7 +606,7 @@ class RmHelper():
                 else:
                     releaseResponse = self.generalAPI('release estop', robotName)
                     self.estopTracker[robotName] += 1
-                    errorLog = ["[AUTO RELEASED] Error " + code, now.strftime("%d/%m/%y %H:%M:%S")]
+                    errorLog = ["[AUTO RELEASED] Error " + code, nowStr]
 
             else:
                 ## Error is not specified, do not auto release
@@ -429,7 +616,9 @@ class RmHelper():
             print(errorLog)
             times.append(errorLog)
             logs["Robot Errors"][robotName] = times
+            self._logsDirty = True
 
-        ## Update logfile to match temp logs after all changes have been made
-        logUpdated = self.updateLogs()
+        ## Flush the logfile once after all changes (including any 502s
+        ## recorded along the way) have been made
+        logUpdated = self.flushLogs()
         print(robotName, str(now), "\nLog updated: ", logUpdated)
\ No newline at end of file
@@ -4,13 +4,16 @@ ROS API Bridge Server
 Converts ROS service calls to REST API endpoints
 """
 
+import concurrent.futures
 import os
+import re
 import subprocess
 import yaml
 import json
-from flask import Flask, request, jsonify
+from flask import Flask, request, Response
 from flask_cors import CORS
 import logging
+import threading
 from enum import Enum
 
 # Configure logging
@@ -23,6 +26,47 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 CORS(app)  # Enable CORS for dashboard access
 
+## flask-caching when available; uptime monitors poll /health every few
+## seconds, so a short SimpleCache window skips rebuilding the response.
+## Without the package the decorator is a no-op and the bridge runs as is
+try:
+    from flask_caching import Cache
+    _cache = Cache(app, config={'CACHE_TYPE': 'SimpleCache'})
+
+    def cached(timeout):
+        return _cache.cached(timeout=timeout)
+except ImportError:
+    def cached(timeout):
+        def decorator(func):
+            return func
+        return decorator
+
+## Shared pool for fanning out independent batch commands
+_BATCH_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=8, thread_name_prefix='ros-batch')
+
+## Batch command names mapped to (ROS service, prebuilt args); static, so
+## built once at import instead of per request
+SERVICE_TABLE = {
+    'reset_soft_estop': ('/device_handler/reset_soft_estop', ()),
+    'enable_motor': ('/flexa_motor_controller/enable', ()),
+    'pause': ('/goal_manager/manage_goals', (1, "")),
+    'resume': ('/goal_manager/manage_goals', (0, "")),
+    'finish': ('/goal_manager/manage_goals', (2, ""))
+}
+
+## orjson when available; the stdlib encoder is a drop-in fallback so the
+## bridge runs without it
+try:
+    import orjson
+
+    def ojsonify(obj, status=200):
+        """Serialize a response body with orjson instead of jsonify"""
+        return Response(orjson.dumps(obj), status=status, mimetype='application/json')
+except ImportError:
+    def ojsonify(obj, status=200):
+        """Serialize a response body with the stdlib encoder (orjson absent)"""
+        return Response(json.dumps(obj), status=status, mimetype='application/json')
+
 class MapServiceResponse(Enum):
     SUCCESS = 0
     MAP_DOES_NOT_EXIST = 1
@@ -30,33 +74,82 @@ class MapServiceResponse(Enum):
     INVALID_MAP_METADATA = 3
     FAILURE = 255
 
+## Static lookup tables, built once at import: target_state index -> name,
+## and result code -> enum name without going through Enum's value dispatch
+_STATE_NAMES = ("base", "navigation", "mapping", "cleaning", "manual")
+_MAP_RESP_NAME = {m.value: m.name for m in MapServiceResponse}
+
+## rosservice prints "result: N"; pull the one integer out with a regex
+## instead of running the full YAML parser over the output. Bytes pattern:
+## stdout is no longer decoded on the success path
+_RESULT_RE = re.compile(rb'result:\s*(\d+)')
+
+def call_ros_service(robot_ip, service, args=(), need_stdout=False):
+    """Invoke a ROS service through rosservice with a prebuilt argv.
+
+    One seam for every endpoint: no shell is forked, arguments are passed
+    as argv entries rather than interpolated into a command string, and a
+    hard timeout keeps a hung master from pinning a Flask worker. The
+    target master rides in the child's environment, so concurrent
+    requests for different robots cannot race on a process-wide
+    ROS_MASTER_URI.
+
+    Most endpoints only check the return code, so stdout goes to DEVNULL
+    unless the caller asks for it (change_map parses the raw bytes); the
+    child's output is never UTF-8 decoded wholesale. stderr is decoded
+    only on failure, where the endpoints report it.
+    """
+    env = dict(os.environ, ROS_MASTER_URI=f"http://{robot_ip}:11311")
+    argv = ["rosservice", "call", service] + [str(a) for a in args]
+    result = subprocess.run(
+        argv,
+        stdout=subprocess.PIPE if need_stdout else subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        timeout=30,
+        env=env
+    )
+    if result.returncode != 0:
+        result.stderr = result.stderr.decode(errors='replace')
+    return result
+
+## Prefer the libyaml C loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+## Parsed config plus a name->ip index, cached on the file's mtime so the
+## per-request lookup path never re-parses YAML
+_CONFIG_CACHE = {'mtime': None, 'data': {}, 'by_name': {}}
+_CONFIG_LOCK = threading.Lock()
+
 def load_robot_config():
-    """Load robot configuration from config.yaml"""
+    """Load robot configuration from config.yaml, reparsed only when it changes"""
     try:
-        with open('config.yaml', 'r') as file:
-            config = yaml.safe_load(file)
-            return config
+        mtime = os.stat('config.yaml').st_mtime_ns
+        if mtime != _CONFIG_CACHE['mtime']:
+            # Gunicorn gthread workers hit this concurrently; serialize the
+            # refresh so readers never see a half-updated cache
+            with _CONFIG_LOCK:
+                if mtime != _CONFIG_CACHE['mtime']:
+                    with open('config.yaml', 'r') as file:
+                        config = yaml.load(file, Loader=_YamlLoader) or {}
+                    fleet = next(iter(config.values()), {})
+                    _CONFIG_CACHE['data'] = config
+                    _CONFIG_CACHE['by_name'] = {info['name']: info['ip'] for info in fleet.values()}
+                    _CONFIG_CACHE['mtime'] = mtime
+        return _CONFIG_CACHE['data']
     except Exception as e:
         logger.error(f"Error loading config: {e}")
         return {}
 
-def set_ros_master_uri(robot_ip):
-    """Set ROS_MASTER_URI for the target robot"""
-    ros_uri = f"http://{robot_ip}:11311"
-    os.environ["ROS_MASTER_URI"] = ros_uri
-    logger.info(f"ROS_MASTER_URI set to {ros_uri}")
-    return ros_uri
-
 def get_robot_ip(robot_name):
     """Get robot IP from config"""
-    config = load_robot_config()
-    fleet = list(config.values())[0]
-    
-    for robot_info in fleet.values():
-        if robot_info["name"] == robot_name:
-            return robot_info["ip"]
-    
-    raise ValueError(f"Robot {robot_name} not found in config")
+    load_robot_config()
+    try:
+        return _CONFIG_CACHE['by_name'][robot_name]
+    except KeyError:
+        raise ValueError(f"Robot {robot_name} not found in config")
 
 # ROS Service API Endpoints
 
@@ -75,32 +168,29 @@ def manage_goals():
         exec_code = data.get('exec_code', 0)
         
         if not robot_name:
-            return jsonify({"error": "robot_name is required"}), 400
+            return ojsonify({"error": "robot_name is required"}, status=400)
         
-        # Set ROS master URI
         robot_ip = get_robot_ip(robot_name)
-        set_ros_master_uri(robot_ip)
         
         # Execute ROS service call
-        cmd = f"rosservice call /goal_manager/manage_goals {exec_code} ''"
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+        result = call_ros_service(robot_ip, "/goal_manager/manage_goals", (exec_code, ""))
         
         if result.returncode == 0:
-            return jsonify({
+            return ojsonify({
                 "success": True,
                 "robot_name": robot_name,
                 "exec_code": exec_code,
                 "message": f"Goal management command {exec_code} executed successfully"
             })
         else:
-            return jsonify({
+            return ojsonify({
                 "error": "ROS service call failed",
                 "details": result.stderr
-            }), 500
+            }, status=500)
             
     except Exception as e:
         logger.error(f"Error in manage_goals: {e}")
-        return jsonify({"error": str(e)}), 500
+        return ojsonify({"error": str(e)}, status=500)
 
 @app.route('/api/ros/change_state', methods=['POST'])
 def change_state():
@@ -119,35 +209,31 @@ def change_state():
         target_state = data.get('target_state', 0)
         
         if not robot_name:
-            return jsonify({"error": "robot_name is required"}), 400
+            return ojsonify({"error": "robot_name is required"}, status=400)
         
-        # Set ROS master URI
         robot_ip = get_robot_ip(robot_name)
-        set_ros_master_uri(robot_ip)
         
         # Execute ROS service call
-        cmd = f"rosservice call /state_supervisor/change_state {target_mode} {target_state}"
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+        result = call_ros_service(robot_ip, "/state_supervisor/change_state", (target_mode, target_state))
         
         if result.returncode == 0:
-            state_names = ["base", "navigation", "mapping", "cleaning", "manual"]
-            state_name = state_names[target_state] if target_state < len(state_names) else "unknown"
+            state_name = _STATE_NAMES[target_state] if 0 <= target_state < len(_STATE_NAMES) else "unknown"
             
-            return jsonify({
+            return ojsonify({
                 "success": True,
                 "robot_name": robot_name,
                 "new_state": state_name,
                 "message": f"Robot state changed to {state_name}"
             })
         else:
-            return jsonify({
+            return ojsonify({
                 "error": "ROS service call failed",
                 "details": result.stderr
-            }), 500
+            }, status=500)
             
     except Exception as e:
         logger.error(f"Error in change_state: {e}")
-        return jsonify({"error": str(e)}), 500
+        return ojsonify({"error": str(e)}, status=500)
 
 @app.route('/api/ros/reset_soft_estop', methods=['POST'])
 def reset_soft_estop():
@@ -162,31 +248,28 @@ def reset_soft_estop():
         robot_name = data.get('robot_name')
         
         if not robot_name:
-            return jsonify({"error": "robot_name is required"}), 400
+            return ojsonify({"error": "robot_name is required"}, status=400)
         
-        # Set ROS master URI
         robot_ip = get_robot_ip(robot_name)
-        set_ros_master_uri(robot_ip)
         
         # Execute ROS service call
-        cmd = "rosservice call /device_handler/reset_soft_estop"
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+        result = call_ros_service(robot_ip, "/device_handler/reset_soft_estop")
         
         if result.returncode == 0:
-            return jsonify({
+            return ojsonify({
                 "success": True,
                 "robot_name": robot_name,
                 "message": "Software E-stop reset successfully"
             })
         else:
-            return jsonify({
+            return ojsonify({
                 "error": "ROS service call failed",
                 "details": result.stderr
-            }), 500
+            }, status=500)
             
     except Exception as e:
         logger.error(f"Error in reset_soft_estop: {e}")
-        return jsonify({"error": str(e)}), 500
+        return ojsonify({"error": str(e)}, status=500)
 
 @app.route('/api/ros/enable_motor', methods=['POST'])
 def enable_motor():
@@ -201,31 +284,28 @@ def enable_motor():
         robot_name = data.get('robot_name')
         
         if not robot_name:
-            return jsonify({"error": "robot_name is required"}), 400
+            return ojsonify({"error": "robot_name is required"}, status=400)
         
-        # Set ROS master URI
         robot_ip = get_robot_ip(robot_name)
-        set_ros_master_uri(robot_ip)
         
         # Execute ROS service call
-        cmd = "rosservice call /flexa_motor_controller/enable"
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+        result = call_ros_service(robot_ip, "/flexa_motor_controller/enable")
         
         if result.returncode == 0:
-            return jsonify({
+            return ojsonify({
                 "success": True,
                 "robot_name": robot_name,
                 "message": "Motor controller enabled successfully"
             })
         else:
-            return jsonify({
+            return ojsonify({
                 "error": "ROS service call failed",
                 "details": result.stderr
-            }), 500
+            }, status=500)
             
     except Exception as e:
         logger.error(f"Error in enable_motor: {e}")
-        return jsonify({"error": str(e)}), 500
+        return ojsonify({"error": str(e)}, status=500)
 
 @app.route('/api/ros/change_map', methods=['POST'])
 def change_map():
@@ -242,34 +322,26 @@ def change_map():
         map_name = data.get('map_name')
         
         if not robot_name or not map_name:
-            return jsonify({"error": "robot_name and map_name are required"}), 400
+            return ojsonify({"error": "robot_name and map_name are required"}, status=400)
         
-        # Set ROS master URI
         robot_ip = get_robot_ip(robot_name)
-        set_ros_master_uri(robot_ip)
         
         # Execute ROS service call for main map
-        cmd = f"rosservice call /change_map {map_name}"
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+        result = call_ros_service(robot_ip, "/change_map", (map_name,), need_stdout=True)
         
         if result.returncode == 0:
             # Parse result
-            try:
-                service_result = yaml.safe_load(result.stdout)['result']
-                status = MapServiceResponse(service_result).name
-            except:
-                status = "UNKNOWN"
+            match = _RESULT_RE.search(result.stdout)
+            status = _MAP_RESP_NAME.get(int(match.group(1)), "UNKNOWN") if match else "UNKNOWN"
             
             # Also change prohibited map
-            cmd_prohibited = f"rosservice call /prohibited_map/change_map {map_name}_prohibited"
-            result_prohibited = subprocess.run(cmd_prohibited, shell=True, capture_output=True, text=True)
+            result_prohibited = call_ros_service(robot_ip, "/prohibited_map/change_map", (f"{map_name}_prohibited",))
             
             # If prohibited map with suffix fails, try without suffix
             if result_prohibited.returncode != 0:
-                cmd_prohibited = f"rosservice call /prohibited_map/change_map {map_name}"
-                result_prohibited = subprocess.run(cmd_prohibited, shell=True, capture_output=True, text=True)
+                result_prohibited = call_ros_service(robot_ip, "/prohibited_map/change_map", (map_name,))
             
-            return jsonify({
+            return ojsonify({
                 "success": True,
                 "robot_name": robot_name,
                 "map_name": map_name,
@@ -277,14 +349,18 @@ def change_map():
                 "message": f"Map changed to {map_name}"
             })
         else:
-            return jsonify({
+            return ojsonify({
                 "error": "ROS service call failed",
                 "details": result.stderr
-            }), 500
+            }, status=500)
             
     except Exception as e:
         logger.error(f"Error in change_map: {e}")
-        return jsonify({"error": str(e)}), 500
+        return ojsonify({"error": str(e)}, status=500)
+
+## Teleop terminal handles, keyed by robot name, so a repeat request can
+## reap an exited terminal instead of leaking the process entry
+_TELEOP_PROCS = {}
 
 @app.route('/api/ros/teleop', methods=['POST'])
 def start_teleop():
@@ -299,18 +375,34 @@ def start_teleop():
         robot_name = data.get('robot_name')
         
         if not robot_name:
-            return jsonify({"error": "robot_name is required"}), 400
+            return ojsonify({"error": "robot_name is required"}, status=400)
         
-        # Set ROS master URI
         robot_ip = get_robot_ip(robot_name)
-        set_ros_master_uri(robot_ip)
         
+        # Reap a previously launched terminal for this robot if it has
+        # already exited; a live one keeps running alongside the new launch
+        stale = _TELEOP_PROCS.get(robot_name)
+        if stale is not None:
+            stale.poll()
+
         # Note: This launches a terminal process, so it's more of a trigger
-        # In production, you might want to handle this differently
-        cmd = 'gnome-terminal -- /bin/bash -c "rosrun teleop_twist_keyboard teleop_twist_keyboard.py cmd_vel:=cmd_vel_rm; exec bash;"'
-        os.system(cmd)
+        # In production, you might want to handle this differently; the
+        # master URI goes into the child's environment, not the server's.
+        # Detached session with no inherited FDs, so the endpoint returns
+        # immediately and the worker never blocks on the terminal
+        env = dict(os.environ, ROS_MASTER_URI=f"http://{robot_ip}:11311")
+        _TELEOP_PROCS[robot_name] = subprocess.Popen(
+            ['gnome-terminal', '--', '/bin/bash', '-c',
+             'rosrun teleop_twist_keyboard teleop_twist_keyboard.py cmd_vel:=cmd_vel_rm; exec bash'],
+            start_new_session=True,
+            close_fds=True,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            env=env
+        )
         
-        return jsonify({
+        return ojsonify({
             "success": True,
             "robot_name": robot_name,
             "message": "Teleop terminal launched"
@@ -318,7 +410,7 @@ def start_teleop():
             
     except Exception as e:
         logger.error(f"Error in start_teleop: {e}")
-        return jsonify({"error": str(e)}), 500
+        return ojsonify({"error": str(e)}, status=500)
 
 @app.route('/api/ros/batch', methods=['POST'])
 def batch_commands():
@@ -338,52 +430,63 @@ def batch_commands():
         commands = data.get('commands', [])
         
         if not robot_name:
-            return jsonify({"error": "robot_name is required"}), 400
+            return ojsonify({"error": "robot_name is required"}, status=400)
         
-        # Set ROS master URI once
         robot_ip = get_robot_ip(robot_name)
-        set_ros_master_uri(robot_ip)
         
-        results = []
+        # Validate up front; results keep the request's command order
+        results = [None] * len(commands)
         all_success = True
-        
-        for cmd_info in commands:
+        calls = []
+        for i, cmd_info in enumerate(commands):
             service = cmd_info.get('service')
-            params = cmd_info.get('params', {})
-            
-            # Map service names to actual ROS commands
-            service_map = {
-                'reset_soft_estop': 'rosservice call /device_handler/reset_soft_estop',
-                'enable_motor': 'rosservice call /flexa_motor_controller/enable',
-                'pause': 'rosservice call /goal_manager/manage_goals 1 ""',
-                'resume': 'rosservice call /goal_manager/manage_goals 0 ""',
-                'finish': 'rosservice call /goal_manager/manage_goals 2 ""'
-            }
-            
-            if service not in service_map:
-                results.append({
+            if service not in SERVICE_TABLE:
+                results[i] = {
                     "service": service,
                     "success": False,
                     "error": "Unknown service"
-                })
+                }
                 all_success = False
                 continue
-            
-            cmd = service_map[service]
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-            
-            results.append({
-                "service": service,
-                "success": result.returncode == 0,
-                "output": result.stdout if result.returncode == 0 else result.stderr
-            })
-            
-            if result.returncode != 0:
-                all_success = False
-                if data.get('stop_on_error', True):
+            ros_service, ros_args = SERVICE_TABLE[service]
+            calls.append((i, service, ros_service, ros_args))
+
+        if data.get('stop_on_error', True):
+            # Order can matter here (e.g. reset_soft_estop before
+            # enable_motor), so run sequentially and stop at the first
+            # failure, as before
+            for i, service, ros_service, ros_args in calls:
+                result = call_ros_service(robot_ip, ros_service, ros_args)
+                results[i] = {
+                    "service": service,
+                    "success": result.returncode == 0,
+                    "output": "" if result.returncode == 0 else result.stderr
+                }
+                if result.returncode != 0:
+                    all_success = False
                     break
-        
-        return jsonify({
+        else:
+            # Commands declared independent: overlap the service
+            # round-trips so the batch costs the slowest call, not the sum
+            futures = {
+                _BATCH_EXECUTOR.submit(call_ros_service, robot_ip, ros_service, ros_args): (i, service)
+                for i, service, ros_service, ros_args in calls
+            }
+            for future in concurrent.futures.as_completed(futures):
+                i, service = futures[future]
+                result = future.result()
+                results[i] = {
+                    "service": service,
+                    "success": result.returncode == 0,
+                    "output": "" if result.returncode == 0 else result.stderr
+                }
+                if result.returncode != 0:
+                    all_success = False
+
+        # Commands skipped after an early stop have no result entry
+        results = [r for r in results if r is not None]
+
+        return ojsonify({
             "success": all_success,
             "robot_name": robot_name,
             "results": results
@@ -391,14 +494,18 @@ def batch_commands():
             
     except Exception as e:
         logger.error(f"Error in batch_commands: {e}")
-        return jsonify({"error": str(e)}), 500
+        return ojsonify({"error": str(e)}, status=500)
 
 @app.route('/health', methods=['GET'])
+@cached(timeout=10)
 def health_check():
     """Health check endpoint"""
-    return jsonify({"status": "healthy", "service": "ros_api_bridge"})
+    return ojsonify({"status": "healthy", "service": "ros_api_bridge"})
 
 if __name__ == '__main__':
+    # Dev-only entry point; Werkzeug serializes requests. In production run
+    # under a threaded WSGI server so independent robots' calls overlap:
+    #   gunicorn -w 4 -k gthread --threads 8 -b 0.0.0.0:8091 ros_api_server:app
     port = 8091  # Different port from main dashboard
     logger.info(f"Starting ROS API Bridge Server on port {port}...")
-    app.run(debug=True, host='0.0.0.0', port=port)
\ No newline at end of file
+    app.run(host='0.0.0.0', port=port)
\ No newline at end of file
@@ -1,5 +1,25 @@
 // main.js - Updated for 1Hz motor updates
 
+// Repeatedly schedule fn with a random jitter added to each delay so that
+// multiple dashboard tabs drift apart instead of hitting the server in
+// lockstep. Returns a handle with a cancel() method (setInterval-style).
+const scheduleWithJitter = (fn, baseInterval, jitterMs = 250) => {
+  let timeoutId = null;
+  let stopped = false;
+  const tick = () => {
+    if (stopped) return;
+    fn();
+    timeoutId = setTimeout(tick, baseInterval + Math.random() * jitterMs);
+  };
+  timeoutId = setTimeout(tick, baseInterval + Math.random() * jitterMs);
+  return {
+    cancel: () => {
+      stopped = true;
+      clearTimeout(timeoutId);
+    }
+  };
+};
+
 // Function to set up motor data updates at 1Hz
 const setupMotorDataUpdateRate = (robotData, lastUpdate, error, loading) => {
   // Create a reactive ref for motor updates
@@ -72,19 +92,19 @@ const setupMotorDataUpdateRate = (robotData, lastUpdate, error, loading) => {
   // Initial fetch
   fetchAllData();
   
-  // Set up intervals
-  mainDataInterval = setInterval(fetchAllData, mainUpdateInterval);
-  
+  // Set up jittered polling loops
+  mainDataInterval = scheduleWithJitter(fetchAllData, mainUpdateInterval);
+
   // Start motor data updates with a slight delay to avoid collision
   setTimeout(() => {
-    motorDataInterval = setInterval(fetchMotorDataOnly, motorUpdateInterval);
+    motorDataInterval = scheduleWithJitter(fetchMotorDataOnly, motorUpdateInterval, 25);
   }, 1000);
-  
+
   // Return both cleanup function and the update key
   return {
     cleanup: () => {
-      clearInterval(mainDataInterval);
-      clearInterval(motorDataInterval);
+      mainDataInterval.cancel();
+      if (motorDataInterval) motorDataInterval.cancel();
     },
     motorUpdateKey
   };
@@ -187,7 +207,7 @@ const setupMotorDataWorker = (robotData, lastUpdate, error, loading) => {
   // Fallback polling method if Web Worker fails
   const setupFallbackPolling = () => {
     console.log('Using fallback polling for motor data');
-    const motorInterval = setInterval(async () => {
+    const motorInterval = scheduleWithJitter(async () => {
       try {
         const response = await fetch(`/api/robot-status?type=motor&t=${Date.now()}`);
         
@@ -209,23 +229,23 @@ const setupMotorDataWorker = (robotData, lastUpdate, error, loading) => {
     const originalCleanup = cleanup;
     cleanup = () => {
       originalCleanup();
-      clearInterval(motorInterval);
+      motorInterval.cancel();
     };
   };
   
   // Initial data fetch
   fetchGeneralData();
   
-  // Set up main data interval
-  mainDataInterval = setInterval(fetchGeneralData, mainUpdateInterval);
+  // Set up main data polling with jitter
+  mainDataInterval = scheduleWithJitter(fetchGeneralData, mainUpdateInterval);
   
   // Initialize the worker
   initWorker();
   
   // Cleanup function
   let cleanup = () => {
-    // Clear intervals
-    clearInterval(mainDataInterval);
+    // Stop the polling loop
+    mainDataInterval.cancel();
     
     // Terminate worker if it exists
     if (worker) {
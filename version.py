@@ -30,20 +30,25 @@ API_VERSION = "v1"
 
 # Build info
 import datetime
+import types
 BUILD_DATE = datetime.datetime.now().isoformat()
 
+# Everything above is fixed at import, so build the info dict once and
+# hand out a read-only view instead of a fresh dict per call
+_VERSION_INFO = types.MappingProxyType({
+    "version": __version__,
+    "app_name": __app_name__,
+    "description": __description__,
+    "api_version": API_VERSION,
+    "build_date": BUILD_DATE,
+    "legacy_name": __legacy_name__,
+    "development_note": __development_note__,
+    "author": __author__
+})
+
 def get_version_info():
     """Get complete version information"""
-    return {
-        "version": __version__,
-        "app_name": __app_name__,
-        "description": __description__,
-        "api_version": API_VERSION,
-        "build_date": BUILD_DATE,
-        "legacy_name": __legacy_name__,
-        "development_note": __development_note__,
-        "author": __author__
-    }
+    return _VERSION_INFO
 
 def print_version():
     """Print version information"""
@@ -1,29 +1,58 @@
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, render_template, request, Response
 from datetime import datetime
+import concurrent.futures
+import copy
+import hashlib
+import ipaddress
+import time
 import traceback
 import yaml
 import os
 import logging
+import logging.handlers
+import queue
 import signal
 import sys
 import atexit
+import tempfile
+import threading
 import requests
+from requests.adapters import HTTPAdapter
 import json
 from dotenv import load_dotenv
 
+from ping_address import load_yaml_cached, _shared_rm_helper
 from ping_addresses import MultiPingChecker, RobotConfig
 
+## Optional helpers hoisted out of the safe_init_* functions; a broken
+## import degrades the matching component to None instead of crashing
+try:
+    from motorReader import MotorController
+except Exception:
+    MotorController = None
+try:
+    from rmHelper import RmHelper
+except Exception:
+    RmHelper = None
+
 from version import get_version_info, __development_note__
 
-# Configure logging
+# Configure logging. The request threads only enqueue records; the
+# stream and file writes happen on the listener's own thread, so a log
+# call on the 1Hz polling path never blocks on disk I/O
+_log_queue = queue.Queue(-1)
+_log_listener = logging.handlers.QueueListener(
+    _log_queue,
+    logging.StreamHandler(),
+    logging.FileHandler('dashboard.log'),
+    respect_handler_level=True
+)
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('dashboard.log')
-    ]
+    handlers=[logging.handlers.QueueHandler(_log_queue)]
 )
+_log_listener.start()
 logger = logging.getLogger(__name__)
 
 load_dotenv()
@@ -34,45 +63,240 @@ AUTHKEY = {"Authorization": os.environ.get("API_AUTH_KEY", "enter-your-api-key")
 
 app = Flask(__name__)
 
-# Define which commands should go to ROS bridge vs existing API
-ROS_COMMANDS = {
-    'pause', 'resume', 'stop', 'reset_soft_estop', 'enable_motor', 
+## Transparent gzip/brotli for clients that advertise Accept-Encoding;
+## the repetitive keys in the motor payloads compress several-fold, and
+## the dashboard works unchanged when flask-compress isn't installed
+try:
+    from flask_compress import Compress
+    app.config['COMPRESS_MIN_SIZE'] = 500
+    app.config['COMPRESS_LEVEL'] = 4
+    Compress(app)
+except ImportError:
+    pass
+
+## Pooled HTTP session for the control proxy: keep-alive connections to
+## the ROS bridge and robot APIs instead of a TCP handshake per command
+SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=32, pool_maxsize=64)
+SESSION.mount('http://', _adapter)
+SESSION.mount('https://', _adapter)
+
+## orjson emits bytes directly and is several times faster than the
+## stdlib encoder on the float-heavy motor payloads; the stdlib is a
+## drop-in fallback so the dashboard runs without it
+try:
+    import orjson
+    from flask.json.provider import JSONProvider
+
+    def ojson(obj, status=200):
+        """Serialize a response body with orjson instead of jsonify"""
+        return Response(orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY),
+                        status=status, mimetype='application/json')
+
+    class ORJSONProvider(JSONProvider):
+        """App-wide JSON provider backed by orjson.
+
+        Covers everything the ojson helper doesn't touch directly:
+        request.json parsing, Response.get_json, and any stray jsonify.
+        """
+
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+    app.json = ORJSONProvider(app)
+except ImportError:
+    orjson = None
+
+    def ojson(obj, status=200):
+        """Serialize a response body with the stdlib encoder (orjson absent)"""
+        return Response(json.dumps(obj), status=status, mimetype='application/json')
+
+# Define which commands should go to ROS bridge vs existing API.
+# Frozen: these are lookup tables, not state
+ROS_COMMANDS = frozenset({
+    'pause', 'resume', 'stop', 'reset_soft_estop', 'enable_motor',
     'change_map', 'change_state', 'teleop', 'manage_goals'
-}
+})
 
-EXISTING_API_COMMANDS = {
+EXISTING_API_COMMANDS = frozenset({
     'start_charging', 'stop_charging', 'navigate_back_to_dock', 'docking',
     'battery_soc', 'is_charging', 'goal_queue_size', 'cleaning_stats',
     'set_cleaning_mode', 'navigation', 'start_process'
+})
+
+## Dashboard commands that ride a differently named bridge endpoint;
+## everything else maps to the endpoint of the same name
+ROS_ENDPOINT_ALIASES = {
+    'pause': 'manage_goals',
+    'resume': 'manage_goals',
+    'stop': 'manage_goals'
 }
 
+## Per-command payload builders, built once at import: the control proxy
+## composes {'robot_name': ...} with its command's builder instead of
+## walking an if/elif chain per request. Commands that carry no extra
+## parameters simply have no entry.
+ROS_PAYLOAD_BUILDERS = {
+    'pause': lambda data: {'exec_code': 1},
+    'resume': lambda data: {'exec_code': 0},
+    'stop': lambda data: {'exec_code': 2},
+    'change_map': lambda data: {'map_name': data.get('map_name', '')},
+    'change_state': lambda data: {'target_mode': data.get('target_mode', 0),
+                                  'target_state': data.get('target_state', 0)},
+    'manage_goals': lambda data: {'exec_code': data.get('exec_code', 0)}
+}
+
+def _start_process_payload(data):
+    payload = {
+        'process': data.get('process'),
+        'order': data.get('order', 'ASCENDING')
+    }
+    if data.get('type'):
+        payload['type'] = data.get('type')
+    if data.get('selection'):
+        payload['selection'] = data.get('selection')
+    return payload
+
+API_PAYLOAD_BUILDERS = {
+    'docking': lambda data: {'action': data.get('action', 'dock')},
+    'set_cleaning_mode': lambda data: {'vacuum': data.get('vacuum', 0),
+                                       'roller': data.get('roller', 0),
+                                       'gutter': data.get('gutter', False)},
+    'navigation': lambda data: {'pose2d': data.get('pose2d', [0, 0, 0])},
+    'start_process': _start_process_payload,
+    'manage_goals': lambda data: {'exec_code': data.get('exec_code', 5),
+                                  'argument': data.get('argument', '100')}
+}
+
+## Every command the proxy will forward; anything else 404s up front
+## instead of tying a worker thread to a 30s timeout on a bogus endpoint
+ALL_COMMANDS = ROS_COMMANDS | EXISTING_API_COMMANDS
+
+def _fast_json(response):
+    """Decode an upstream response body, preferring orjson's C parser.
+
+    A non-JSON body degrades to a message dict instead of raising, so a
+    misbehaving robot API can't 500 the whole proxy.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(response.content)
+        except orjson.JSONDecodeError:
+            return {"message": response.text}
+    try:
+        return response.json()
+    except ValueError:
+        return {"message": response.text}
+
+def _build_command_payload(builders, command, robot_name, data):
+    """Compose the outbound payload from the command's precomputed builder."""
+    payload = {'robot_name': robot_name}
+    builder = builders.get(command)
+    if builder is not None:
+        payload.update(builder(data))
+    return payload
+
+## Prefer the libyaml C dumper when PyYAML was built with it
+try:
+    from yaml import CSafeDumper as _YamlDumper
+except ImportError:
+    from yaml import SafeDumper as _YamlDumper
+
+## Parsed-config cache keyed on config.yaml's mtime, so the polling
+## endpoints return an O(1) dict instead of re-running the YAML parser
+## per request. Callers mutate the result, so hand out a deep copy.
+_CONFIG_CACHE = {'mtime': None, 'data': None}
+
+def _invalidate_config_cache():
+    """Drop the cached parse and JSON sidecar after config.yaml is rewritten"""
+    _CONFIG_CACHE['mtime'] = None
+    try:
+        os.remove('config.yaml.json')
+    except OSError:
+        pass
+
+def _build_config_view(config):
+    """Transform the raw YAML mapping into the robots/system shape."""
+    robots = []
+    for fleet_name, fleet_data in (config or {}).items():
+        for robot_id, robot_info in fleet_data.items():
+            robots.append({
+                'id': robot_id,
+                'name': robot_info.get('name', robot_id),
+                'ip': robot_info.get('ip', '127.0.0.1'),
+                'has_motors': robot_info.get('has_motors', False)
+            })
+    return {
+        'robots': robots,
+        'system': {
+            'update_interval': 5,
+            'motor_update_interval': 1
+        }
+    }
+
+## Single-thread writer for config.yaml: write requests hand the dump off
+## here and return, and one worker means writes land in submission order
+_CONFIG_WRITER = concurrent.futures.ThreadPoolExecutor(
+    max_workers=1, thread_name_prefix='config-writer')
+
+def _write_config(config):
+    """Dump the raw config atomically and keep the parse cache warm.
+
+    The YAML is dumped with the C dumper to a tmp file in the same
+    directory and renamed into place, so a crash mid-write can never
+    leave a truncated config. The parse cache is refilled from the
+    in-memory dict, so the next read costs a dict copy rather than a
+    re-parse of what was just written.
+    """
+    fd, tmp = tempfile.mkstemp(dir='.', prefix='.config.', suffix='.yaml')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            yaml.dump(config, f, Dumper=_YamlDumper,
+                      default_flow_style=False, sort_keys=False)
+        os.replace(tmp, 'config.yaml')
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    _invalidate_config_cache()
+    _CONFIG_CACHE['data'] = _build_config_view(config)
+    _CONFIG_CACHE['mtime'] = os.stat('config.yaml').st_mtime_ns
+
+def _save_config(config):
+    """Queue an atomic config write; the request returns without waiting.
+
+    Validation has already accepted the change by the time this runs, so
+    the response doesn't need to sit behind the YAML dump and fsync. The
+    writer thread logs a failure instead of surfacing it to the client.
+    """
+    def write():
+        try:
+            _write_config(config)
+        except Exception:
+            logger.exception("Failed to write config.yaml")
+    _CONFIG_WRITER.submit(write)
+
+def _load_raw_config():
+    """Raw YAML mapping for the write endpoints, which edit fleets in place."""
+    try:
+        return load_yaml_cached('config.yaml')
+    except OSError:
+        return None
+
 def load_robot_config():
-    """Load robot configuration from config.yaml"""
+    """Load robot configuration from config.yaml, reparsed only when it changes"""
     try:
-        with open('config.yaml') as f:
-            config = yaml.safe_load(f)
-            
-            robots = []
-            system_config = {
-                'update_interval': 5,
-                'motor_update_interval': 1
-            }
-            
-            # Parse fleet configuration
-            for fleet_name, fleet_data in config.items():
-                for robot_id, robot_info in fleet_data.items():
-                    robot_entry = {
-                        'id': robot_id,
-                        'name': robot_info.get('name', robot_id),
-                        'ip': robot_info.get('ip', '127.0.0.1'),
-                        'has_motors': robot_info.get('has_motors', False)
-                    }
-                    robots.append(robot_entry)
-            
-            return {
-                'robots': robots,
-                'system': system_config
-            }
+        mtime = os.stat('config.yaml').st_mtime_ns
+        if mtime == _CONFIG_CACHE['mtime']:
+            return copy.deepcopy(_CONFIG_CACHE['data'])
+
+        # Shares the pinger module's cached loader: libyaml C parser plus
+        # the pre-parsed JSON sidecar, so warm loads skip YAML entirely
+        _CONFIG_CACHE['data'] = _build_config_view(load_yaml_cached('config.yaml'))
+        _CONFIG_CACHE['mtime'] = mtime
+        return copy.deepcopy(_CONFIG_CACHE['data'])
     except Exception as e:
         logger.error(f"Error loading robot config: {e}")
         return {
@@ -116,13 +340,33 @@ def cleanup_resources():
     if rm_helper:
         try:
             logger.info("Cleaning up RM helper...")
-            # Add any specific cleanup for rm_helper if needed
+            # Persist any log entries still sitting in memory
+            rm_helper.flushLogs()
             rm_helper = None
         except Exception as e:
             logger.error(f"Error cleaning up RM helper: {e}")
     
+    # Let any queued config write land before the process exits
+    try:
+        _CONFIG_WRITER.shutdown(wait=True)
+    except Exception:
+        pass
+
+    # Drop the pooled keep-alive connections
+    try:
+        SESSION.close()
+    except Exception:
+        pass
+
     logger.info("Graceful shutdown completed")
 
+    # Flush queued records and stop the logging listener last, so the
+    # shutdown messages above still reach dashboard.log
+    try:
+        _log_listener.stop()
+    except Exception:
+        pass
+
 def signal_handler(signum, frame):
     """Handle shutdown signals"""
     signal_names = {
@@ -138,154 +382,234 @@ def signal_handler(signum, frame):
     logger.info("Exiting...")
     sys.exit(0)
 
+## The SPA shell is read once at startup and served from memory; it
+## almost never changes, so browsers can revalidate with the ETag and a
+## short max-age instead of re-downloading on every refresh
+try:
+    with open(os.path.join(app.static_folder, 'index.html'), 'rb') as f:
+        _INDEX_BYTES = f.read()
+    _INDEX_ETAG = hashlib.sha1(_INDEX_BYTES).hexdigest()
+except OSError:
+    _INDEX_BYTES = None
+    _INDEX_ETAG = None
+
 @app.route('/')
 def index():
-    return app.send_static_file('index.html')
+    if _INDEX_BYTES is None:
+        return app.send_static_file('index.html')
+    if _INDEX_ETAG in request.if_none_match:
+        return Response(status=304)
+    resp = Response(_INDEX_BYTES, mimetype='text/html')
+    resp.set_etag(_INDEX_ETAG)
+    resp.cache_control.public = True
+    resp.cache_control.max_age = 60
+    return resp
+
+## Pre-serialized bodies for the config-derived endpoints, keyed on the
+## config's mtime so the JSON is encoded once per config change rather
+## than once per poll: endpoint -> (mtime_ns, body_bytes, etag)
+_BODY_CACHE = {}
+
+def _config_response(endpoint, build):
+    """Serve a config-derived endpoint from cached bytes with an ETag.
+
+    The body is rebuilt only when config.yaml changes; a matching
+    If-None-Match short-circuits to a 304 with no serialization at all.
+    """
+    mtime = os.stat('config.yaml').st_mtime_ns
+    hit = _BODY_CACHE.get(endpoint)
+    if hit is None or hit[0] != mtime:
+        body = json.dumps(build()).encode()
+        hit = (mtime, body, hashlib.sha1(body).hexdigest())
+        _BODY_CACHE[endpoint] = hit
+    _, body, etag = hit
+    if etag in request.if_none_match:
+        return Response(status=304)
+    resp = Response(body, mimetype='application/json')
+    resp.set_etag(etag)
+    return resp
 
 @app.route('/api/config')
 def get_config():
     """API endpoint to get robot configuration for frontend"""
     try:
         config = load_robot_config()
-        if not config or 'flexa' not in config:
-            return jsonify({"error": "No robot configuration found"}), 500
-        
+        if not config or not config['robots']:
+            return ojson({"error": "No robot configuration found"}), 500
+
         # Extract robot names and motor capabilities
-        robots = []
-        for robot_id, robot_data in config['flexa'].items():
-            robots.append({
-                'name': robot_data['name'],
-                'ip': robot_data['ip'],
-                'has_motors': robot_data.get('has_motors', False)
-            })
-        
-        return jsonify({
-            'robots': robots,
-            'system': config.get('system', {})
+        return _config_response('config', lambda: {
+            'robots': [
+                {
+                    'name': robot['name'],
+                    'ip': robot['ip'],
+                    'has_motors': robot['has_motors']
+                }
+                for robot in config['robots']
+            ],
+            'system': config['system']
         })
     except Exception as e:
         logger.error(f"Error getting config: {e}")
-        return jsonify({"error": str(e)}), 500
+        return ojson({"error": str(e)}), 500
 
 @app.route('/logs')
 def get_logs():
     try:
-        robot_name = request.args.get('robot_name', 'base1')
+        # getLogs is fleet-wide; no per-robot query arg to parse here
         if rm_helper:
-            return jsonify(rm_helper.getLogs())
+            return ojson(rm_helper.getLogs())
         else:
-            return jsonify({"error": "RmHelper not initialized"}), 500
+            return ojson({"error": "RmHelper not initialized"}), 500
     except Exception as e:
         logger.error(f"Error getting logs: {e}")
-        return jsonify({"error": str(e)}), 500
+        return ojson({"error": str(e)}), 500
 
 @app.route('/status')
 def get_status():
     try:
         robot_name = request.args.get('robot_name', 'base1')
         if rm_helper:
-            return jsonify({'status': rm_helper.getWorkingStatus(robot_name)})
+            return ojson({'status': rm_helper.getWorkingStatus(robot_name)})
         else:
-            return jsonify({"error": "RmHelper not initialized"}), 500
+            return ojson({"error": "RmHelper not initialized"}), 500
     except Exception as e:
         logger.error(f"Error getting status: {e}")
-        return jsonify({"error": str(e)}), 500
+        return ojson({"error": str(e)}), 500
+
+## Throttle for the polled endpoints' exception logging: a recurring 1Hz
+## failure walks and writes one traceback per window, not one per poll
+_ERROR_LOG_INTERVAL = 5.0
+_last_error_ts = 0.0
+
+def _log_throttled_exception(message):
+    """logger.exception, rate-limited for errors that recur at poll rate."""
+    global _last_error_ts
+    now = time.monotonic()
+    if now - _last_error_ts >= _ERROR_LOG_INTERVAL:
+        _last_error_ts = now
+        logger.exception(message)
+
+def _motor_bytes_response():
+    """Serve the checker's pre-encoded motor payload with a version ETag.
+
+    The body is encoded on the producer side once per update, so 1Hz
+    polling from many browsers reuses the same bytes; an If-None-Match
+    hit returns a bodyless 304.
+    """
+    # Opt-in variants: ?layout=soa ships field names once per motor
+    # instead of once per robot, and Accept: application/msgpack packs
+    # floats as 4 bytes. Explicit opt-ins (browsers send Accept: */*,
+    # which must keep getting JSON); the AoS JSON default is unchanged
+    body = None
+    if request.args.get('layout') == 'soa':
+        body, version = b2_ping_checker.motor_soa_json_bytes()
+        mimetype, etag = 'application/json', f'{version}-soa'
+    elif 'application/msgpack' in request.headers.get('Accept', ''):
+        body, version = b2_ping_checker.motor_msgpack_bytes()
+        if body is not None:
+            mimetype, etag = 'application/msgpack', f'{version}-mp'
+    if body is None:
+        body, version = b2_ping_checker.motor_json_bytes()
+        mimetype, etag = 'application/json', str(version)
+    if request.if_none_match.contains_weak(etag):
+        return Response(status=304)
+    # direct_passthrough hands the pre-encoded bytes straight to the WSGI
+    # layer without Werkzeug re-buffering the body
+    resp = Response(body, mimetype=mimetype, direct_passthrough=True)
+    resp.set_etag(etag, weak=True)
+    # no-cache means revalidate, not don't-store: the browser keeps the
+    # body and re-sends If-None-Match each poll
+    resp.headers['Cache-Control'] = 'no-cache'
+    return resp
+
+## Single-flight cache for the general/full robot-status bodies: the first
+## request at a given fleet-state version serializes under the lock while
+## concurrent identical requests block on it and reuse the same bytes
+_STATUS_BODY_CACHE = {}
+_STATUS_BODY_LOCK = threading.Lock()
+
+def _status_body_bytes(request_type, version, build):
+    """Return the encoded body for (request_type, version), built at most once."""
+    cached = _STATUS_BODY_CACHE.get(request_type)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    with _STATUS_BODY_LOCK:
+        cached = _STATUS_BODY_CACHE.get(request_type)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        if orjson is not None:
+            body = orjson.dumps(build(), option=orjson.OPT_SERIALIZE_NUMPY)
+        else:
+            body = json.dumps(build()).encode()
+        _STATUS_BODY_CACHE[request_type] = (version, body)
+        return body
 
 @app.route('/api/robot-status')
 def get_robot_status():
     try:
         if not b2_ping_checker:
-            logger.warning("b2_ping_checker not initialized, returning empty data")
-            return jsonify({
+            logger.debug("b2_ping_checker not initialized, returning empty data")
+            return ojson({
                 'ping_status': {},
                 'robot_status': {},
                 'cleaning_device_status': {},
                 'motor_data': {}
             })
             
-        # Check request type to optimize response
+        # Check request type to optimize response. The checker
+        # initializes every state dict in __init__, so the attributes are
+        # read directly instead of through per-request getattr fallbacks
         request_type = request.args.get('type', 'full')
-        
-        # Get data with safe fallbacks
-        ping_status = getattr(b2_ping_checker, 'dict_of_ping_status', {})
-        
-        # Motor data only response (optimized for 1Hz polling)
+
+        # Motor data only response (optimized for 1Hz polling). The
+        # checker pre-serializes the payload once per update, so this is
+        # a bytes handoff; every robot row already carries motor1/motor2
+        # zero templates, so no placeholder fill is needed here
         if request_type == 'motor':
-            motor_data = {}
-            if hasattr(b2_ping_checker, 'dict_of_motor_data'):
-                motor_data = b2_ping_checker.dict_of_motor_data
-                
-                # Debug the motor data that's being returned
-                logger.info(f"Motor data response contains {len(motor_data)} robots")
-                
-                # Make sure we're returning the correctly structured data for display
-                for robot_name, robot_data in motor_data.items():
-                    # Ensure each robot has motor1 and motor2
-                    if 'motor1' not in robot_data:
-                        logger.warning(f"Adding missing motor1 structure for {robot_name}")
-                        motor_data[robot_name]['motor1'] = {
-                            "pos_rad": 0.0, "pos_offset": 0.0, "vel_rpm": 0.0, 
-                            "vel_rad": 0.0, "current": 0.0
-                        }
-                    
-                    if 'motor2' not in robot_data:
-                        logger.warning(f"Adding missing motor2 structure for {robot_name}")
-                        motor_data[robot_name]['motor2'] = {
-                            "pos_rad": 0.0, "pos_offset": 0.0, "vel_rpm": 0.0, 
-                            "vel_rad": 0.0, "current": 0.0
-                        }
-                
-                # For each online robot that doesn't have motor data, add placeholder structure
-                # This will allow the UI to at least show the pending state
-                for robot_name, is_online in ping_status.items():
-                    if is_online and robot_name not in motor_data:
-                        logger.info(f"Adding placeholder motor data for online robot {robot_name}")
-                        motor_data[robot_name] = {
-                            "motor1": {"pos_rad": 0.0, "pos_offset": 0.0, "vel_rpm": 0.0, "vel_rad": 0.0, "current": 0.0},
-                            "motor2": {"pos_rad": 0.0, "pos_offset": 0.0, "vel_rpm": 0.0, "vel_rad": 0.0, "current": 0.0}
-                        }
-                
-            # Return minimal response for motor data
-            return jsonify({
-                'ping_status': ping_status,
-                'motor_data': motor_data
-            })
-            
+            return _motor_bytes_response()
+
+        # Anything else serves the full shape; collapse it to 'full'
+        # before the value becomes an ETag and a cache key, so arbitrary
+        # ?type= strings can't grow _STATUS_BODY_CACHE without bound
+        if request_type != 'general':
+            request_type = 'full'
+
+        # General and full shapes carry the fleet-state version as a weak
+        # ETag, so an unchanged poll short-circuits to a bodyless 304
+        # before any serialization
+        version = b2_ping_checker.state_version
+        etag = f'{version}-{request_type}'
+        if request.if_none_match.contains_weak(etag):
+            return Response(status=304)
+
         # General data response (excluding motor data)
-        elif request_type == 'general':
-            robot_status = getattr(b2_ping_checker, 'dict_of_robot_status', {})
-            cleaning_device_status = getattr(b2_ping_checker, 'dict_of_cleaning_device_status', {})
-            
-            # Return everything except motor data
-            return jsonify({
-                'ping_status': ping_status,
-                'robot_status': robot_status,
-                'cleaning_device_status': cleaning_device_status
-            })
-            
+        if request_type == 'general':
+            def build():
+                return {
+                    'ping_status': b2_ping_checker.dict_of_ping_status,
+                    'robot_status': b2_ping_checker.dict_of_robot_status,
+                    'cleaning_device_status': b2_ping_checker.dict_of_cleaning_device_status
+                }
         # Full response (default)
         else:
-            robot_status = getattr(b2_ping_checker, 'dict_of_robot_status', {})
-            cleaning_device_status = getattr(b2_ping_checker, 'dict_of_cleaning_device_status', {})
-            
-            # Check if motor_data attribute exists
-            motor_data = {}
-            if hasattr(b2_ping_checker, 'dict_of_motor_data'):
-                motor_data = b2_ping_checker.dict_of_motor_data
-            
-            response_data = {
-                'ping_status': ping_status,
-                'robot_status': robot_status,
-                'cleaning_device_status': cleaning_device_status,
-                'motor_data': motor_data
-            }
-            
-            return jsonify(response_data)
+            def build():
+                return {
+                    'ping_status': b2_ping_checker.dict_of_ping_status,
+                    'robot_status': b2_ping_checker.dict_of_robot_status,
+                    'cleaning_device_status': b2_ping_checker.dict_of_cleaning_device_status,
+                    'motor_data': b2_ping_checker.dict_of_motor_data
+                }
+        body = _status_body_bytes(request_type, version, build)
+        resp = Response(body, mimetype='application/json',
+                        direct_passthrough=True)
+        resp.set_etag(etag, weak=True)
+        resp.headers['Cache-Control'] = 'no-cache'
+        return resp
             
     except Exception as e:
-        error_details = traceback.format_exc()
-        logger.error(f"Error in get_robot_status: {e}\n{error_details}")
-        return jsonify({
+        _log_throttled_exception("Error in get_robot_status")
+        return ojson({
             'error': str(e),
             'ping_status': {},
             'robot_status': {},
@@ -293,10 +617,54 @@ def get_robot_status():
             'motor_data': {}
         }), 500
     
+@app.route('/api/robot-status/stream')
+def robot_status_stream():
+    """Push robot-state changes over Server-Sent Events.
+
+    One long-lived response replaces the three polled shapes of
+    /api/robot-status: the generator blocks on the checker's change
+    condition and emits only the robots whose state differs from this
+    client's last snapshot, so an idle fleet costs keep-alive comments
+    instead of full payloads every second.
+    """
+    if not b2_ping_checker:
+        return ojson({"error": "b2_ping_checker not initialized"}, status=503)
+
+    def snapshot():
+        motor_data = b2_ping_checker.dict_of_motor_data
+        return {
+            robot: {
+                'online': online,
+                'robot_status': b2_ping_checker.dict_of_robot_status.get(robot, {}),
+                'cleaning_device_status': b2_ping_checker.dict_of_cleaning_device_status.get(robot, {}),
+                'motor_data': motor_data.get(robot, {})
+            }
+            for robot, online in b2_ping_checker.dict_of_ping_status.items()
+        }
+
+    def stream():
+        last = {}
+        version = -1
+        while True:
+            new_version = b2_ping_checker.wait_for_change(version, timeout=30.0)
+            if new_version == version:
+                # Nothing moved; comment line keeps proxies from
+                # dropping the idle connection
+                yield ': keep-alive\n\n'
+                continue
+            version = new_version
+            current = snapshot()
+            diff = {robot: state for robot, state in current.items()
+                    if last.get(robot) != state}
+            if diff:
+                yield f"data: {json.dumps(diff)}\n\n"
+                last = current
+
+    return Response(stream(), mimetype='text/event-stream')
+
 def safe_init_motor_controller():
     """Safely initialize the MotorController with fallback to None"""
     try:
-        from motorReader import MotorController
         logger.info("Initializing MotorController...")
         return MotorController()
     except Exception as e:
@@ -306,30 +674,50 @@ def safe_init_motor_controller():
 def safe_init_ping_checker():
     """Safely initialize MultiPingChecker using configuration"""
     try:
-        from ping_addresses import MultiPingChecker
         logger.info("Initializing MultiPingChecker...")
-        # No need to pass address book - it will load from config
-        checker = MultiPingChecker()
-        
-        # Make sure dict_of_motor_data exists
-        if not hasattr(checker, 'dict_of_motor_data'):
-            checker.dict_of_motor_data = {}
-            
-        return checker
+        # No need to pass address book - it will load from config;
+        # MultiPingChecker initializes all of its state dicts itself
+        return MultiPingChecker()
     except Exception as e:
         logger.error(f"Failed to initialize MultiPingChecker: {e}")
         return None
 
 def safe_init_rm_helper():
-    """Safely initialize RmHelper"""
+    """Safely initialize RmHelper.
+
+    Returns the pinger-shared singleton: the pingers append and flush
+    log entries through their instance, so /logs must read the same
+    in-memory copy rather than a second helper frozen at startup.
+    """
     try:
-        from rmHelper import RmHelper
         logger.info("Initializing RmHelper...")
-        return RmHelper()
+        return _shared_rm_helper()
     except Exception as e:
         logger.error(f"Failed to initialize RmHelper: {e}")
         return None
 
+def create_app():
+    """Start the background components and return the WSGI app.
+
+    Production entry point for a threaded WSGI server. The checker state
+    lives in this process, so run one worker with threads rather than
+    several forked workers each pinging the fleet:
+
+        gunicorn -w 1 -k gthread --threads 8 -b 0.0.0.0:8000 'web:create_app()'
+    """
+    global b2_ping_checker, rm_helper
+    if b2_ping_checker is None:
+        b2_ping_checker = safe_init_ping_checker()
+        if b2_ping_checker:
+            logger.info("Starting ping checker...")
+            b2_ping_checker.startPing()
+        else:
+            logger.error("Failed to initialize ping checker, dashboard will have limited functionality")
+    if rm_helper is None:
+        logger.info("Initializing RmHelper")
+        rm_helper = safe_init_rm_helper()
+    return app
+
 @app.route('/api/motor-data')
 def get_motor_data_only():
     """
@@ -339,23 +727,17 @@ def get_motor_data_only():
     """
     try:
         if not b2_ping_checker:
-            logger.warning("b2_ping_checker not initialized, returning empty data")
-            return jsonify({
+            logger.debug("b2_ping_checker not initialized, returning empty data")
+            return ojson({
                 'motor_data': {}
             })
-            
-        # Get only motor data with safe fallbacks
-        motor_data = {}
-        if hasattr(b2_ping_checker, 'dict_of_motor_data'):
-            motor_data = b2_ping_checker.dict_of_motor_data
-        
-        return jsonify({
-            'motor_data': motor_data
-        })
+
+        # Same pre-encoded payload as /api/robot-status?type=motor; the
+        # extra ping_status key is additive for existing consumers
+        return _motor_bytes_response()
     except Exception as e:
-        error_details = traceback.format_exc()
-        logger.error(f"Error in get_motor_data_only: {e}\n{error_details}")
-        return jsonify({
+        _log_throttled_exception("Error in get_motor_data_only")
+        return ojson({
             'error': str(e),
             'motor_data': {}
         }), 500
@@ -363,59 +745,66 @@ def get_motor_data_only():
 @app.route('/api/direct_motor_data', methods=['POST'])
 def direct_motor_data():
     try:
-        data = request.json
+        # Bound the injected payload before parsing it, and parse without
+        # caching: the dict is consumed once, so Flask keeping a second
+        # reference alive for the request's lifetime buys nothing
+        if request.content_length and request.content_length > 1_048_576:
+            return ojson({"error": "Payload too large"}), 413
+        data = request.get_json(silent=True, cache=False)
         if not data or not isinstance(data, dict):
-            return jsonify({"error": "Invalid data format"}), 400
+            return ojson({"error": "Invalid data format"}), 400
             
-        # Store the injected motor data
-        if hasattr(b2_ping_checker, 'dict_of_motor_data') and data.get('motor_data'):
-            b2_ping_checker.dict_of_motor_data = data['motor_data']
-            logger.info(f"Injected motor data for {len(data['motor_data'])} robots")
-            
-        # Update online status for robots
-        if hasattr(b2_ping_checker, 'dict_of_ping_status') and data.get('online_robots'):
+        # Store the injected motor data, validating the shape once up
+        # front instead of trusting it blind
+        motor_data = data.get('motor_data')
+        if b2_ping_checker and motor_data:
+            if not isinstance(motor_data, dict):
+                return ojson({"error": "motor_data must be an object"}, status=400)
+            b2_ping_checker.dict_of_motor_data = motor_data
+            logger.debug("Injected motor data for %d robots", len(motor_data))
+
+        # Update online status: one set build gives O(1) membership per
+        # robot. Each row goes through _set_reachable so the online mask,
+        # the per-pinger mirror and the state/motor versions stay in sync
+        # (a wholesale dict rebind would bypass all of them and never
+        # wake the stream consumers)
+        if b2_ping_checker and data.get('online_robots'):
+            online = set(data['online_robots'])
             for robot in b2_ping_checker.dict_of_ping_status:
-                b2_ping_checker.dict_of_ping_status[robot] = robot in data['online_robots']
-            logger.info(f"Updated online status for {len(data['online_robots'])} robots")
+                b2_ping_checker._set_reachable(robot, robot in online)
+            logger.debug("Updated online status for %d robots", len(online))
             
-        return jsonify({"success": True})
+        return ojson({"success": True})
     except Exception as e:
         logger.error(f"Error in direct_motor_data endpoint: {e}")
-        return jsonify({"error": str(e)}), 500
+        return ojson({"error": str(e)}), 500
 
 @app.route('/api/robots', methods=['GET'])
 def get_robots():
     """Get list of all configured robots"""
     try:
         config = load_robot_config()
-        if not config or 'flexa' not in config:
-            return jsonify({"error": "No robot configuration found"}), 500
-        
-        robots = []
-        for robot_id, robot_data in config['flexa'].items():
-            robots.append({
-                'id': robot_id,
-                'name': robot_data['name'],
-                'ip': robot_data['ip'],
-                'has_motors': robot_data.get('has_motors', False)
-            })
-        
-        return jsonify({'robots': robots})
+        if not config or not config['robots']:
+            return ojson({"error": "No robot configuration found"}), 500
+
+        return _config_response('robots', lambda: {'robots': config['robots']})
     except Exception as e:
         logger.error(f"Error getting robots: {e}")
-        return jsonify({"error": str(e)}), 500
+        return ojson({"error": str(e)}), 500
 
 @app.route('/api/robots', methods=['POST'])
 def add_robot():
     """Add a new robot via API"""
     try:
-        data = request.json
-        
+        data = request.get_json(silent=True, cache=False)
+        if not data:
+            return ojson({"error": "No data provided"}), 400
+
         # Validate required fields
         required_fields = ['id', 'name', 'ip']
         for field in required_fields:
             if field not in data:
-                return jsonify({"error": f"Missing required field: {field}"}), 400
+                return ojson({"error": f"Missing required field: {field}"}), 400
         
         robot_id = data['id'].strip().lower()
         name = data['name'].strip()
@@ -424,19 +813,18 @@ def add_robot():
         
         # Validate IP
         try:
-            import ipaddress
             ipaddress.ip_address(ip)
         except ValueError:
-            return jsonify({"error": "Invalid IP address"}), 400
+            return ojson({"error": "Invalid IP address"}), 400
         
-        # Load current config
-        config = load_robot_config()
+        # Load the raw config; the write endpoints edit fleets in place
+        config = _load_raw_config()
         if not config:
-            config = {'flexa': {}, 'system': {}}
-        
+            config = {'flexa': {}}
+
         # Check if robot already exists
         if robot_id in config['flexa']:
-            return jsonify({"error": f"Robot '{robot_id}' already exists"}), 409
+            return ojson({"error": f"Robot '{robot_id}' already exists"}), 409
         
         # Add robot
         config['flexa'][robot_id] = {
@@ -446,13 +834,12 @@ def add_robot():
         }
         
         # Save config
-        with open('config.yaml', 'w') as f:
-            yaml.dump(config, f, default_flow_style=False, sort_keys=False)
+        _save_config(config)
         
         logger.info(f"Added robot '{robot_id}' via API")
         
         # Note: The ping checker would need to be restarted to pick up the new robot
-        return jsonify({
+        return ojson({
             "success": True, 
             "message": "Robot added successfully. Restart required for changes to take effect.",
             "robot": {
@@ -465,31 +852,30 @@ def add_robot():
         
     except Exception as e:
         logger.error(f"Error adding robot: {e}")
-        return jsonify({"error": str(e)}), 500
+        return ojson({"error": str(e)}), 500
 
 @app.route('/api/robots/<robot_id>', methods=['DELETE'])
 def remove_robot(robot_id):
     """Remove a robot via API"""
     try:
-        # Load current config
-        config = load_robot_config()
+        # Load the raw config; the write endpoints edit fleets in place
+        config = _load_raw_config()
         if not config or 'flexa' not in config:
-            return jsonify({"error": "No robot configuration found"}), 500
+            return ojson({"error": "No robot configuration found"}), 500
         
         # Check if robot exists
         if robot_id not in config['flexa']:
-            return jsonify({"error": f"Robot '{robot_id}' not found"}), 404
+            return ojson({"error": f"Robot '{robot_id}' not found"}), 404
         
         # Remove robot
         removed_robot = config['flexa'].pop(robot_id)
         
         # Save config
-        with open('config.yaml', 'w') as f:
-            yaml.dump(config, f, default_flow_style=False, sort_keys=False)
+        _save_config(config)
         
         logger.info(f"Removed robot '{robot_id}' via API")
         
-        return jsonify({
+        return ojson({
             "success": True,
             "message": "Robot removed successfully. Restart required for changes to take effect.",
             "removed_robot": {
@@ -501,22 +887,24 @@ def remove_robot(robot_id):
         
     except Exception as e:
         logger.error(f"Error removing robot: {e}")
-        return jsonify({"error": str(e)}), 500
+        return ojson({"error": str(e)}), 500
 
 @app.route('/api/robots/<robot_id>', methods=['PUT'])
 def update_robot(robot_id):
     """Update a robot's configuration via API"""
     try:
-        data = request.json
+        data = request.get_json(silent=True, cache=False)
+        if not data:
+            return ojson({"error": "No data provided"}), 400
         
-        # Load current config
-        config = load_robot_config()
+        # Load the raw config; the write endpoints edit fleets in place
+        config = _load_raw_config()
         if not config or 'flexa' not in config:
-            return jsonify({"error": "No robot configuration found"}), 500
+            return ojson({"error": "No robot configuration found"}), 500
         
         # Check if robot exists
         if robot_id not in config['flexa']:
-            return jsonify({"error": f"Robot '{robot_id}' not found"}), 404
+            return ojson({"error": f"Robot '{robot_id}' not found"}), 404
         
         # Update fields
         robot = config['flexa'][robot_id]
@@ -526,21 +914,19 @@ def update_robot(robot_id):
             ip = data['ip'].strip()
             # Validate IP
             try:
-                import ipaddress
                 ipaddress.ip_address(ip)
                 robot['ip'] = ip
             except ValueError:
-                return jsonify({"error": "Invalid IP address"}), 400
+                return ojson({"error": "Invalid IP address"}), 400
         if 'has_motors' in data:
             robot['has_motors'] = bool(data['has_motors'])
         
         # Save config
-        with open('config.yaml', 'w') as f:
-            yaml.dump(config, f, default_flow_style=False, sort_keys=False)
+        _save_config(config)
         
         logger.info(f"Updated robot '{robot_id}' via API")
         
-        return jsonify({
+        return ojson({
             "success": True,
             "message": "Robot updated successfully. Restart required for changes to take effect.",
             "robot": {
@@ -553,382 +939,401 @@ def update_robot(robot_id):
         
     except Exception as e:
         logger.error(f"Error updating robot: {e}")
-        return jsonify({"error": str(e)}), 500
+        return ojson({"error": str(e)}), 500
     
+## The about payload never changes after import, so serialize it once
+## here instead of rebuilding the dict and re-encoding on every hit
+def _build_about_json():
+    # Copy before annotating: the shared version info is read-only
+    info = dict(get_version_info())
+    info['development_story'] = __development_note__
+    info['features'] = [
+        "Real-time robot monitoring",
+        "Motor data visualization",
+        "Dynamic configuration",
+        "Modern web interface",
+        "RESTful API",
+        "Built entirely with Claude"
+    ]
+    if orjson is not None:
+        return orjson.dumps(info)
+    return json.dumps(info).encode()
+
+_ABOUT_JSON = _build_about_json()
+
 @app.route('/api/about')
 def get_about_info():
     """API endpoint to get project information including development story"""
-    try:
-        info = get_version_info()
-        info['development_story'] = __development_note__
-        info['features'] = [
-            "Real-time robot monitoring",
-            "Motor data visualization", 
-            "Dynamic configuration",
-            "Modern web interface",
-            "RESTful API",
-            "Built entirely with Claude"
-        ]
-        return jsonify(info)
-    except Exception as e:
-        return jsonify({
-            "error": str(e),
-            "app_name": "Robot Fleet Dashboard",
-            "note": "Built as a human-AI collaboration experiment"
-        })
+    resp = Response(_ABOUT_JSON, mimetype='application/json',
+                    direct_passthrough=True)
+    # Version info only changes on restart; let the about page reuse it
+    resp.headers['Cache-Control'] = 'public, max-age=60'
+    return resp
+
+## The about page moved to static/about.html so web.py no longer embeds
+## a 4 KB HTML literal; like the SPA shell it is read once at startup
+## and served from memory with an ETag
+try:
+    with open(os.path.join(app.static_folder, 'about.html'), 'rb') as f:
+        _ABOUT_HTML = f.read()
+    _ABOUT_ETAG = hashlib.sha1(_ABOUT_HTML).hexdigest()
+except OSError:
+    _ABOUT_HTML = None
+    _ABOUT_ETAG = None
 
 @app.route('/about')
 def about_page():
     """About page showing development story"""
-    return '''
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>About - Robot Fleet Dashboard</title>
-        <meta charset="utf-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1">
-        <link href="https://cdn.jsdelivr.net/npm/tailwindcss@2.2.19/dist/tailwind.min.css" rel="stylesheet">
-    </head>
-    <body class="bg-gray-100">
-        <div class="container mx-auto px-4 py-8">
-            <div class="max-w-4xl mx-auto bg-white rounded-lg shadow-lg p-8">
-                <h1 class="text-3xl font-bold text-gray-800 mb-6">🤖 Robot Fleet Dashboard</h1>
-                
-                <div class="bg-blue-50 border-l-4 border-blue-400 p-4 mb-6">
-                    <h2 class="text-xl font-semibold text-blue-800 mb-2">Development Story</h2>
-                    <p class="text-blue-700">
-                        This entire project was built as a personal experiment to test Claude's capabilities 
-                        while creating something practical for my company. Every line of code, architecture 
-                        decision, and feature was developed through human-AI collaboration.
-                    </p>
-                </div>
-                
-                <div class="grid md:grid-cols-2 gap-6 mb-6">
-                    <div>
-                        <h3 class="text-lg font-semibold text-gray-800 mb-3">🏗️ What We Built Together</h3>
-                        <ul class="list-disc list-inside text-gray-600 space-y-1">
-                            <li>Full-stack web application</li>
-                            <li>Real-time robot monitoring</li>
-                            <li>Motor data visualization</li>
-                            <li>Dynamic configuration system</li>
-                            <li>RESTful API</li>
-                            <li>Security implementation</li>
-                            <li>Complete documentation</li>
-                        </ul>
-                    </div>
-                    
-                    <div>
-                        <h3 class="text-lg font-semibold text-gray-800 mb-3">🚀 Technologies Used</h3>
-                        <ul class="list-disc list-inside text-gray-600 space-y-1">
-                            <li>Python Flask backend</li>
-                            <li>Modern JavaScript frontend</li>
-                            <li>ROS integration</li>
-                            <li>YAML configuration</li>
-                            <li>Real-time data streaming</li>
-                            <li>Responsive web design</li>
-                        </ul>
-                    </div>
-                </div>
-                
-                <div class="bg-green-50 border-l-4 border-green-400 p-4 mb-6">
-                    <h3 class="text-lg font-semibold text-green-800 mb-2">💡 The Result</h3>
-                    <p class="text-green-700">
-                        A production-ready robot fleet monitoring dashboard that evolved from a simple 
-                        ping checker into a comprehensive management system. This showcases what's 
-                        possible when human creativity meets AI capabilities.
-                    </p>
-                </div>
-                
-                <div class="text-center">
-                    <a href="/" class="bg-blue-500 hover:bg-blue-600 text-white font-bold py-2 px-4 rounded">
-                        Back to Dashboard
-                    </a>
-                </div>
-                
-                <div class="mt-8 text-center text-gray-500 text-sm">
-                    <p>Built through human-AI collaboration 🤖❤️👨‍💻</p>
-                    <div id="version-info" class="mt-2"></div>
-                </div>
-            </div>
-        </div>
-        
-        <script>
-            fetch('/api/about')
-                .then(response => response.json())
-                .then(data => {
-                    document.getElementById('version-info').innerHTML = 
-                        `Version ${data.version} | Built ${new Date(data.build_date).toLocaleDateString()}`;
-                })
-                .catch(error => console.log('Version info not available'));
-        </script>
-    </body>
-    </html>
-    '''
+    if _ABOUT_HTML is None:
+        return app.send_static_file('about.html')
+    if _ABOUT_ETAG in request.if_none_match:
+        return Response(status=304)
+    resp = Response(_ABOUT_HTML, mimetype='text/html',
+                    direct_passthrough=True)
+    resp.set_etag(_ABOUT_ETAG)
+    resp.headers['Cache-Control'] = 'public, max-age=3600'
+    return resp
 
-@app.route('/api/robot-control/<command>', methods=['POST'])
-def robot_control_proxy(command):
-    """
-    Hybrid robot control proxy - routes to ROS bridge or existing API based on command
+def _exec_robot_control(command, data):
+    """Run one control command and return (body, status).
+
+    Plain function shared by the route and the batch handler, so batch
+    sub-commands are an in-process call instead of a loopback HTTP
+    request through the WSGI stack.
     """
+    robot_name = data.get('robot_name')
     try:
-        data = request.get_json()
-        if not data:
-            return jsonify({"error": "No data provided"}), 400
-        
-        robot_name = data.get('robot_name')
+        if command not in ALL_COMMANDS:
+            return {"error": f"Unknown command: {command}"}, 404
+
         if not robot_name:
-            return jsonify({"error": "robot_name is required"}), 400
+            return {"error": "robot_name is required"}, 400
 
         # Route to ROS Bridge for ROS commands
         if command in ROS_COMMANDS:
-            logger.info(f"Routing {command} to ROS bridge for {robot_name}")
-            
-            # Map dashboard commands to ROS bridge endpoints
-            ros_endpoint_map = {
-                'pause': 'manage_goals',
-                'resume': 'manage_goals',
-                'stop': 'manage_goals',
-                'reset_soft_estop': 'reset_soft_estop',
-                'enable_motor': 'enable_motor',
-                'change_map': 'change_map',
-                'change_state': 'change_state',
-                'teleop': 'teleop',
-                'manage_goals': 'manage_goals'
-            }
+            logger.info("Routing %s to ROS bridge for %s", command, robot_name)
             
-            ros_endpoint = ros_endpoint_map.get(command, command)
+            # Endpoint and payload come from the precomputed tables
+            ros_endpoint = ROS_ENDPOINT_ALIASES.get(command, command)
             ros_url = f"{ROS_API_URL}/api/ros/{ros_endpoint}"
-            
-            # Build payload for ROS bridge
-            ros_payload = {"robot_name": robot_name}
-            
-            # Add command-specific parameters
-            if command == 'pause':
-                ros_payload['exec_code'] = 1
-            elif command == 'resume':
-                ros_payload['exec_code'] = 0
-            elif command == 'stop':
-                ros_payload['exec_code'] = 2
-            elif command == 'change_map':
-                ros_payload['map_name'] = data.get('map_name', '')
-            elif command == 'change_state':
-                ros_payload['target_mode'] = data.get('target_mode', 0)
-                ros_payload['target_state'] = data.get('target_state', 0)
-            elif command == 'manage_goals':
-                ros_payload['exec_code'] = data.get('exec_code', 0)
-            
+
+            ros_payload = _build_command_payload(
+                ROS_PAYLOAD_BUILDERS, command, robot_name, data)
+
             # Make request to ROS bridge
-            response = requests.post(
+            response = SESSION.post(
                 ros_url,
                 json=ros_payload,
-                timeout=30
+                timeout=(3, 30)
             )
             
             if response.ok:
-                result = response.json()
-                logger.info(f"ROS bridge success: {robot_name} -> {command}")
-                return jsonify(result)
+                result = _fast_json(response)
+                logger.info("ROS bridge success: %s -> %s", robot_name, command)
+                return result, 200
             else:
-                logger.error(f"ROS bridge failed: {robot_name} -> {command} -> {response.status_code}")
-                return jsonify({
+                logger.error("ROS bridge failed: %s -> %s -> %s", robot_name, command, response.status_code)
+                return {
                     "error": f"ROS bridge returned status {response.status_code}",
                     "details": response.text
-                }), response.status_code
+                }, response.status_code
                 
         # Route to existing API for non-ROS commands
         else:
-            logger.info(f"Routing {command} to existing API for {robot_name}")
+            logger.info("Routing %s to existing API for %s", command, robot_name)
             
             # Use the same API configuration as rmHelper/remotecontroller
             API_URL = ROBOT_API_BASE_URL
             API_HEADERS = AUTHKEY
             
-            # Build the request URL and payload
+            # Build the request URL and payload from the precomputed tables
             endpoint_url = API_URL.rstrip('/') + '/' + command
-            
-            # Base payload - always include robot_name
-            payload = {"robot_name": robot_name}
-            
-            # Add command-specific parameters
-            if command == 'docking':
-                payload['action'] = data.get('action', 'dock')
-            elif command == 'set_cleaning_mode':
-                payload.update({
-                    'vacuum': data.get('vacuum', 0),
-                    'roller': data.get('roller', 0), 
-                    'gutter': data.get('gutter', False)
-                })
-            elif command == 'navigation':
-                payload['pose2d'] = data.get('pose2d', [0, 0, 0])
-            elif command == 'start_process':
-                payload.update({
-                    'process': data.get('process'),
-                    'order': data.get('order', 'ASCENDING')
-                })
-                if data.get('type'):
-                    payload['type'] = data.get('type')
-                if data.get('selection'):
-                    payload['selection'] = data.get('selection')
-            elif command == 'manage_goals':
-                payload.update({
-                    'exec_code': data.get('exec_code', 5),
-                    'argument': data.get('argument', '100')
-                })
-            
+            payload = _build_command_payload(
+                API_PAYLOAD_BUILDERS, command, robot_name, data)
+
             # Make the API call
-            logger.info(f"Robot control: {robot_name} -> {command} -> {endpoint_url}")
+            logger.info("Robot control: %s -> %s -> %s", robot_name, command, endpoint_url)
             
-            response = requests.post(
+            response = SESSION.post(
                 endpoint_url,
                 headers=API_HEADERS,
                 json=payload,
-                timeout=30
+                timeout=(3, 30)
             )
             
             if response.status_code == 200:
-                try:
-                    result = response.json()
-                except:
-                    result = {"message": response.text}
-                
-                logger.info(f"Robot control success: {robot_name} -> {command}")
-                return jsonify({
+                result = _fast_json(response)
+
+                logger.info("Robot control success: %s -> %s", robot_name, command)
+                return {
                     "success": True,
                     "command": command,
                     "robot_name": robot_name,
                     "result": result
-                })
+                }, 200
             else:
-                logger.error(f"Robot control failed: {robot_name} -> {command} -> {response.status_code}")
-                return jsonify({
+                logger.error("Robot control failed: %s -> %s -> %s", robot_name, command, response.status_code)
+                return {
                     "error": f"Robot API returned status {response.status_code}",
                     "details": response.text
-                }), response.status_code
+                }, response.status_code
             
     except requests.exceptions.Timeout:
-        logger.error(f"Robot control timeout: {robot_name} -> {command}")
-        return jsonify({"error": "Command timed out"}), 408
-        
+        logger.error("Robot control timeout: %s -> %s", robot_name, command)
+        return {"error": "Command timed out"}, 408
+
     except requests.exceptions.ConnectionError:
-        logger.error(f"Robot control connection error: {robot_name} -> {command}")
-        return jsonify({"error": "Cannot connect to robot API"}), 503
-        
+        logger.error("Robot control connection error: %s -> %s", robot_name, command)
+        return {"error": "Cannot connect to robot API"}, 503
+
     except Exception as e:
-        logger.error(f"Robot control error: {robot_name} -> {command} -> {str(e)}")
-        return jsonify({"error": str(e)}), 500
+        logger.error("Robot control error: %s -> %s -> %s", robot_name, command, e)
+        return {"error": str(e)}, 500
 
-@app.route('/api/robot-control/batch', methods=['POST'])
-def robot_control_batch():
+@app.route('/api/robot-control/<command>', methods=['POST'])
+def robot_control_proxy(command):
     """
-    Execute multiple robot control commands in sequence.
-    Now supports both ROS and existing API commands.
+    Hybrid robot control proxy - routes to ROS bridge or existing API based on command
     """
-    try:
-        data = request.get_json()
-        if not data or 'commands' not in data:
-            return jsonify({"error": "No commands provided"}), 400
-        
-        commands = data['commands']
-        robot_name = data.get('robot_name')
-        
-        if not robot_name:
-            return jsonify({"error": "robot_name is required"}), 400
-        
-        results = []
-        
-        for cmd in commands:
-            command = cmd.get('command')
-            params = cmd.get('params', {})
-            
-            # Add robot_name to params
-            params['robot_name'] = robot_name
-            
-            # Check if this is a ROS command that should use the bridge
-            if command in ROS_COMMANDS:
-                logger.info(f"Batch: Routing {command} to ROS bridge")
-                
-                # Use the ROS batch endpoint
-                try:
-                    ros_response = requests.post(
-                        f"{ROS_API_URL}/api/ros/batch",
-                        json={
-                            "robot_name": robot_name,
-                            "commands": [{
-                                "service": command,
-                                "params": params
-                            }],
-                            "stop_on_error": False
-                        },
-                        timeout=30
-                    )
-                    
-                    if ros_response.ok:
-                        ros_result = ros_response.json()
-                        if ros_result.get('results') and len(ros_result['results']) > 0:
-                            result = {
-                                "command": command,
-                                "success": ros_result['results'][0].get('success', False),
-                                "result": ros_result['results'][0]
-                            }
-                        else:
-                            result = {
-                                "command": command,
-                                "success": False,
-                                "error": "No result from ROS bridge"
-                            }
-                    else:
-                        result = {
-                            "command": command,
-                            "success": False,
-                            "error": f"ROS bridge error: {ros_response.status_code}"
-                        }
-                        
-                except Exception as e:
-                    result = {
-                        "command": command,
-                        "success": False,
-                        "error": str(e)
-                    }
-            else:
-                # Use existing API
-                logger.info(f"Batch: Routing {command} to existing API")
-                
-                try:
-                    # Make internal request to our own API
-                    internal_response = requests.post(
-                        f"http://localhost:{request.environ.get('SERVER_PORT', '8000')}/api/robot-control/{command}",
-                        json=params,
-                        timeout=30
-                    )
-                    
-                    result = {
-                        "command": command,
-                        "success": internal_response.status_code == 200,
-                        "result": internal_response.json()
-                    }
-                    
-                except Exception as e:
-                    result = {
+    data = request.get_json(silent=True, cache=False)
+    if not data:
+        return ojson({"error": "No data provided"}), 400
+
+    body, status = _exec_robot_control(command, data)
+    return ojson(body, status=status)
+
+def _dispatch_batch_command(cmd, robot_name):
+    """Run one batch sub-command and return its result dict."""
+    command = cmd.get('command')
+    params = dict(cmd.get('params', {}))
+    params['robot_name'] = robot_name
+
+    # Check if this is a ROS command that should use the bridge
+    if command in ROS_COMMANDS:
+        logger.info("Batch: Routing %s to ROS bridge", command)
+
+        # Use the ROS batch endpoint
+        try:
+            ros_response = SESSION.post(
+                f"{ROS_API_URL}/api/ros/batch",
+                json={
+                    "robot_name": robot_name,
+                    "commands": [{
+                        "service": command,
+                        "params": params
+                    }],
+                    "stop_on_error": False
+                },
+                timeout=(3, 30)
+            )
+
+            if ros_response.ok:
+                ros_result = _fast_json(ros_response)
+                if ros_result.get('results') and len(ros_result['results']) > 0:
+                    return {
                         "command": command,
-                        "success": False,
-                        "error": str(e)
+                        "success": ros_result['results'][0].get('success', False),
+                        "result": ros_result['results'][0]
                     }
-            
-            results.append(result)
-            
-            # If command failed and stop_on_error is True, break
-            if not result['success'] and data.get('stop_on_error', True):
-                break
-        
-        return jsonify({
-            "success": all(r['success'] for r in results),
+                return {
+                    "command": command,
+                    "success": False,
+                    "error": "No result from ROS bridge"
+                }
+            return {
+                "command": command,
+                "success": False,
+                "error": f"ROS bridge error: {ros_response.status_code}"
+            }
+
+        except Exception as e:
+            return {
+                "command": command,
+                "success": False,
+                "error": str(e)
+            }
+
+    # Use existing API via the shared in-process dispatcher: no loopback
+    # socket, no second pass through the WSGI stack
+    logger.info("Batch: Routing %s to existing API", command)
+
+    body, status = _exec_robot_control(command, params)
+    return {
+        "command": command,
+        "success": status == 200,
+        "result": body
+    }
+
+def _dispatch_ros_batch(cmds, robot_name, stop_on_error):
+    """Send several ROS-bound sub-commands in one bridge batch POST.
+
+    The bridge accepts the whole array natively, so N commands cost one
+    HTTP round trip instead of N wrapped single-entry posts. Results
+    come back in command order; with stop_on_error the bridge omits the
+    commands it skipped, matching the sequential path's early break.
+    """
+    names = [cmd.get('command') for cmd in cmds]
+    try:
+        ros_response = SESSION.post(
+            f"{ROS_API_URL}/api/ros/batch",
+            json={
+                "robot_name": robot_name,
+                "commands": [{
+                    "service": cmd.get('command'),
+                    "params": {**cmd.get('params', {}), 'robot_name': robot_name}
+                } for cmd in cmds],
+                "stop_on_error": stop_on_error
+            },
+            timeout=(3, 30)
+        )
+    except Exception as e:
+        return [{"command": name, "success": False, "error": str(e)}
+                for name in names]
+
+    if not ros_response.ok:
+        return [{"command": name, "success": False,
+                 "error": f"ROS bridge error: {ros_response.status_code}"}
+                for name in names]
+
+    return [{
+        "command": entry.get('service'),
+        "success": entry.get('success', False),
+        "result": entry
+    } for entry in _fast_json(ros_response).get('results') or []]
+
+def _run_batch(robot_name, commands, stop_on_error):
+    """Execute a list of control commands and return the batch result dict.
+
+    With stop_on_error true (the default) the commands run in sequence
+    and the batch stops at the first failure; an all-ROS batch still
+    collapses to a single bridge POST, which enforces the same
+    semantics on its side. With stop_on_error false the commands are
+    independent, so the ROS-bound ones go out as one bridge batch while
+    the rest fan out across a thread pool, and the whole batch costs
+    the slowest round trip instead of the sum.
+    """
+    try:
+        overall_success = True
+        ros_commands = ROS_COMMANDS  # LOAD_FAST in the comprehension
+        ros_idx = [i for i, cmd in enumerate(commands)
+                   if cmd.get('command') in ros_commands]
+
+        if len(ros_idx) == len(commands) and len(commands) > 1:
+            # Every command rides the bridge: one batch POST replaces N
+            results = _dispatch_ros_batch(commands, robot_name, stop_on_error)
+            overall_success = all(r['success'] for r in results)
+        elif not stop_on_error and len(commands) > 1:
+            # Independent commands: one bridge batch for the ROS ones,
+            # thread-pool fan-out for the rest, merged back into request
+            # order by index
+            results = [None] * len(commands)
+            api_cmds = [(i, cmd) for i, cmd in enumerate(commands)
+                        if i not in set(ros_idx)]
+            with concurrent.futures.ThreadPoolExecutor(
+                    max_workers=min(8, len(api_cmds) + 1)) as executor:
+                ros_future = None
+                if ros_idx:
+                    ros_future = executor.submit(
+                        _dispatch_ros_batch,
+                        [commands[i] for i in ros_idx], robot_name, False)
+                api_futures = {
+                    executor.submit(_dispatch_batch_command, cmd, robot_name): i
+                    for i, cmd in api_cmds
+                }
+                if ros_future is not None:
+                    for i, result in zip(ros_idx, ros_future.result()):
+                        results[i] = result
+                        overall_success = overall_success and result['success']
+                for future, i in api_futures.items():
+                    results[i] = future.result()
+                    overall_success = overall_success and results[i]['success']
+            results = [r for r in results if r is not None]
+        else:
+            results = []
+            for cmd in commands:
+                result = _dispatch_batch_command(cmd, robot_name)
+                results.append(result)
+                overall_success = overall_success and result['success']
+
+                # If command failed and stop_on_error is True, break
+                if not result['success'] and stop_on_error:
+                    break
+
+        return {
+            "success": overall_success,
             "robot_name": robot_name,
             "results": results
-        })
-        
+        }
+
     except Exception as e:
-        logger.error(f"Batch robot control error: {str(e)}")
-        return jsonify({"error": str(e)}), 500
+        logger.error("Batch robot control error: %s", e)
+        return {"error": str(e)}
+
+@app.route('/api/robot-control/batch', methods=['POST'])
+def robot_control_batch():
+    """
+    Execute multiple robot control commands.
+    Now supports both ROS and existing API commands.
+    """
+    data = request.get_json(silent=True, cache=False)
+    if not data or 'commands' not in data:
+        return ojson({"error": "No commands provided"}), 400
+
+    robot_name = data.get('robot_name')
+    if not robot_name:
+        return ojson({"error": "robot_name is required"}), 400
+
+    return ojson(_run_batch(robot_name, data['commands'],
+                            data.get('stop_on_error', True)))
+
+## Predefined operation presets: static data, so the dict and its JSON
+## encoding are built once at import instead of per GET
+_PRESETS = {
+    "dock_and_charge": {
+        "name": "Dock and Charge",
+        "description": "Navigate to dock and start charging",
+        "commands": [
+            {"command": "navigate_back_to_dock", "params": {}},
+            {"command": "docking", "params": {"action": "dock"}},
+            {"command": "start_charging", "params": {}}
+        ]
+    },
+    "emergency_stop": {
+        "name": "Emergency Stop",
+        "description": "Immediately stop all operations",
+        "commands": [
+            {"command": "stop", "params": {}}  # This will use ROS bridge
+        ]
+    },
+    "start_cleaning_cycle": {
+        "name": "Start Full Cleaning",
+        "description": "Configure cleaning devices and start cleaning",
+        "commands": [
+            {"command": "set_cleaning_mode", "params": {"vacuum": 2, "roller": 1, "gutter": True}},
+            {"command": "start_process", "params": {"process": "default_cleaning", "order": "ASCENDING"}}
+        ]
+    },
+    "reset_and_resume": {
+        "name": "Reset E-Stop and Resume",
+        "description": "Reset e-stop, enable motor, and resume operations",
+        "commands": [
+            {"command": "reset_soft_estop", "params": {}},  # ROS bridge
+            {"command": "enable_motor", "params": {}},      # ROS bridge
+            {"command": "resume", "params": {}}              # ROS bridge
+        ]
+    },
+    "pause_and_dock": {
+        "name": "Pause and Dock",
+        "description": "Pause current operation and return to dock",
+        "commands": [
+            {"command": "pause", "params": {}},              # ROS bridge
+            {"command": "navigate_back_to_dock", "params": {}},
+            {"command": "docking", "params": {"action": "dock"}}
+        ]
+    }
+}
+_PRESETS_JSON = (orjson.dumps(_PRESETS) if orjson is not None
+                 else json.dumps(_PRESETS).encode())
 
 @app.route('/api/robot-presets', methods=['GET'])
 def get_robot_presets():
@@ -936,52 +1341,8 @@ def get_robot_presets():
     Get predefined robot operation presets.
     Updated to include ROS commands.
     """
-    presets = {
-        "dock_and_charge": {
-            "name": "Dock and Charge",
-            "description": "Navigate to dock and start charging",
-            "commands": [
-                {"command": "navigate_back_to_dock", "params": {}},
-                {"command": "docking", "params": {"action": "dock"}},
-                {"command": "start_charging", "params": {}}
-            ]
-        },
-        "emergency_stop": {
-            "name": "Emergency Stop",
-            "description": "Immediately stop all operations",
-            "commands": [
-                {"command": "stop", "params": {}}  # This will use ROS bridge
-            ]
-        },
-        "start_cleaning_cycle": {
-            "name": "Start Full Cleaning",
-            "description": "Configure cleaning devices and start cleaning",
-            "commands": [
-                {"command": "set_cleaning_mode", "params": {"vacuum": 2, "roller": 1, "gutter": True}},
-                {"command": "start_process", "params": {"process": "default_cleaning", "order": "ASCENDING"}}
-            ]
-        },
-        "reset_and_resume": {
-            "name": "Reset E-Stop and Resume",
-            "description": "Reset e-stop, enable motor, and resume operations",
-            "commands": [
-                {"command": "reset_soft_estop", "params": {}},  # ROS bridge
-                {"command": "enable_motor", "params": {}},      # ROS bridge
-                {"command": "resume", "params": {}}              # ROS bridge
-            ]
-        },
-        "pause_and_dock": {
-            "name": "Pause and Dock",
-            "description": "Pause current operation and return to dock",
-            "commands": [
-                {"command": "pause", "params": {}},              # ROS bridge
-                {"command": "navigate_back_to_dock", "params": {}},
-                {"command": "docking", "params": {"action": "dock"}}
-            ]
-        }
-    }
-    
-    return jsonify(presets)
+    return Response(_PRESETS_JSON, mimetype='application/json',
+                    direct_passthrough=True)
 
 @app.route('/api/robot-presets/<preset_name>', methods=['POST'])
 def execute_robot_preset(preset_name):
@@ -989,40 +1350,32 @@ def execute_robot_preset(preset_name):
     Execute a predefined robot preset.
     """
     try:
-        data = request.get_json()
+        data = request.get_json(silent=True, cache=False)
+        if not data:
+            return ojson({"error": "No data provided"}), 400
         robot_name = data.get('robot_name')
         
         if not robot_name:
-            return jsonify({"error": "robot_name is required"}), 400
-        
-        # Get presets
-        presets_response = get_robot_presets()
-        presets = presets_response.get_json()
-        
-        if preset_name not in presets:
-            return jsonify({"error": f"Unknown preset: {preset_name}"}), 400
+            return ojson({"error": "robot_name is required"}), 400
         
-        preset = presets[preset_name]
-        
-        # Execute preset as batch command
-        batch_data = {
-            "robot_name": robot_name,
-            "commands": preset["commands"],
-            "stop_on_error": data.get("stop_on_error", True)
-        }
-        
-        # Use internal batch endpoint
-        batch_response = robot_control_batch()
-        
-        return jsonify({
+        preset = _PRESETS.get(preset_name)
+        if preset is None:
+            return ojson({"error": f"Unknown preset: {preset_name}"}), 400
+
+        # Execute the preset's commands through the shared batch runner;
+        # no second request parse, no Flask re-dispatch
+        batch_result = _run_batch(robot_name, preset["commands"],
+                                  data.get("stop_on_error", True))
+
+        return ojson({
             "preset": preset_name,
             "preset_description": preset["description"],
-            "batch_result": batch_response.get_json()
+            "batch_result": batch_result
         })
         
     except Exception as e:
-        logger.error(f"Preset execution error: {preset_name} -> {str(e)}")
-        return jsonify({"error": str(e)}), 500
+        logger.error("Preset execution error: %s -> %s", preset_name, e)
+        return ojson({"error": str(e)}), 500
 
 
 if __name__ == '__main__':
@@ -1058,21 +1411,12 @@ if __name__ == '__main__':
             logger.critical("Failed to load robot configuration")
             sys.exit(1)
             
-        # Initialize the ping checker
-        b2_ping_checker = safe_init_ping_checker()
-
-        if b2_ping_checker:
-            logger.info("Starting ping checker...")
-            b2_ping_checker.startPing()
-        else:
-            logger.error("Failed to initialize ping checker, dashboard will have limited functionality")
-        
-        logger.info("Initializing RmHelper")
-        rm_helper = safe_init_rm_helper()
+        # Initialize the ping checker and helpers
+        create_app()
         
         # Check if ROS API bridge is running
         try:
-            health_check = requests.get(f"{ROS_API_URL}/health", timeout=2)
+            health_check = SESSION.get(f"{ROS_API_URL}/health", timeout=2)
             if health_check.ok:
                 logger.info("ROS API Bridge is running")
             else:
@@ -1088,7 +1432,15 @@ if __name__ == '__main__':
         logger.info(f"Robot API expected at: {ROBOT_API_BASE_URL}")
         
         try:
-            app.run(debug=True, host='0.0.0.0', port=port)
+            # Real deployments run under gunicorn (see create_app); the
+            # debugger/reloader stays behind --dev. A plain `python
+            # web.py` gets a threaded Werkzeug server so concurrent
+            # polls and control commands don't serialize through one
+            # single-threaded handler.
+            if '--dev' in sys.argv:
+                app.run(debug=True, host='0.0.0.0', port=port)
+            else:
+                app.run(host='0.0.0.0', port=port, threaded=True)
         except KeyboardInterrupt:
             # This handles the case where Ctrl+C is pressed during app.run()
             logger.info("KeyboardInterrupt received during Flask startup")
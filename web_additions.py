@@ -6,7 +6,8 @@ from version import get_version_info, __development_note__
 def get_about_info():
     """API endpoint to get project information including development story"""
     try:
-        info = get_version_info()
+        # Copy before annotating: the shared version info is read-only
+        info = dict(get_version_info())
         info['development_story'] = __development_note__
         info['features'] = [
             "Real-time robot monitoring",